@@ -0,0 +1,336 @@
+import argparse
+import decimal
+import json
+import numpy as np
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import typing
+from analysis import fixed_point, inflation, registry, scenario, tax
+
+
+# A benchmark's setup runs once, untimed, and returns the function to be timed
+Setup = typing.Callable[[], typing.Callable[[], object]]
+# As above, but the function returns what it built and how many records that is
+MemorySetup = typing.Callable[[], typing.Callable[[], tuple[object, int]]]
+
+_TAX_FILE = "data/aus_tax_table.json"
+_INFLATION_FILE = "data/aus_inflation.json"
+
+
+def _scalar_tax(
+    n: int, arithmetic: fixed_point.Arithmetic = fixed_point.Arithmetic.DECIMAL
+) -> Setup:
+    def setup() -> typing.Callable[[], object]:
+        tables = tax.load_tax_tables(_TAX_FILE).year_tables
+        incomes = [decimal.Decimal(int(i)) for i in _incomes(n)]
+        return lambda: [t.calculate_tax(i, arithmetic) for t in tables for i in incomes]
+
+    return setup
+
+
+def _scalar_tax_cents(n: int) -> Setup:
+    def setup() -> typing.Callable[[], object]:
+        tables = [
+            t.fixed_point_table for t in tax.load_tax_tables(_TAX_FILE).year_tables
+        ]
+        incomes = [int(i) * 100 for i in _incomes(n)]
+        return lambda: [t.tax_units(i) for t in tables for i in incomes]
+
+    return setup
+
+
+def _vector_tax(n: int) -> Setup:
+    def setup() -> typing.Callable[[], object]:
+        tables = tax.load_tax_tables(_TAX_FILE).year_tables
+        incomes = _incomes(n)
+        return lambda: [t.calculate_tax_many(incomes) for t in tables]
+
+    return setup
+
+
+def _scenarios(count: int, n: int, batched: bool) -> Setup:
+    # Each scenario changes the middle rate & moves the threshold above it
+    def setup() -> typing.Callable[[], object]:
+        base = tax.load_tax_tables(_TAX_FILE).table_for(2024)
+        tables = [
+            scenario.with_threshold(
+                scenario.with_rate(
+                    base, 2, decimal.Decimal("0.3") + decimal.Decimal(i) / 10_000
+                ),
+                3,
+                base.brackets[3].start + i * 100,
+            )
+            for i in range(count)
+        ]
+        incomes = _incomes(n)
+        if batched:
+            return lambda: scenario.calculate_tax_many(tables, incomes)
+        return lambda: [t.calculate_tax_many(incomes) for t in tables]
+
+    return setup
+
+
+def _adjust(
+    arithmetic: fixed_point.Arithmetic = fixed_point.Arithmetic.DECIMAL,
+) -> Setup:
+    def setup() -> typing.Callable[[], object]:
+        inflate = inflation.load_inflation(_INFLATION_FILE)
+        years = [y.year for y in inflate.years] + [inflate.years[0].year + 1]
+        amount = decimal.Decimal(45_000)
+        return lambda: [
+            inflate.adjust(amount=amount, from_year=f, to_year=t, arithmetic=arithmetic)
+            for f in years
+            for t in years
+            if f <= t
+        ]
+
+    return setup
+
+
+def _adjusted_for_inflation(cached: bool) -> Setup:
+    def setup() -> typing.Callable[[], object]:
+        tables = tax.load_tax_tables(_TAX_FILE)
+        inflate = inflation.load_inflation(_INFLATION_FILE)
+
+        def run() -> object:
+            if not cached:
+                tax.adjusted_views.clear()
+            return tables.adjusted_for_inflation(inflate)
+
+        return run
+
+    return setup
+
+
+def _load(load: typing.Callable[..., object], mode: str) -> Setup:
+    # cold parses the JSON, disk reads the compiled cache, memory hits the registry
+    def setup() -> typing.Callable[[], object]:
+        def run() -> object:
+            if mode != "memory":
+                registry.invalidate()
+            return load(use_cache=mode != "cold")
+
+        return run
+
+    return setup
+
+
+def _load_one_year_lazily() -> typing.Callable[[], object]:
+    def run() -> object:
+        registry.invalidate()
+        return tax.load_tax_tables(_TAX_FILE, lazy=True).table_for(2024)
+
+    return run
+
+
+def _import(module: typing.Optional[str]) -> Setup:
+    # A cold start of a fresh interpreter, which is what a new worker pays
+    def setup() -> typing.Callable[[], object]:
+        script = f"import {module}" if module is not None else "pass"
+        return lambda: subprocess.run([sys.executable, "-c", script], check=True)
+
+    return setup
+
+
+def _incomes(n: int) -> np.typing.NDArray[np.int64]:
+    return np.random.default_rng(0).integers(0, 500_000, size=n, dtype=np.int64)
+
+
+def _tax_brackets(copies: int) -> MemorySetup:
+    # Copies stand in for other jurisdictions & scenarios, held at the same time
+    def setup() -> typing.Callable[[], tuple[object, int]]:
+        with open(_TAX_FILE, "r") as fh:
+            content = json.load(fh)
+
+        def build() -> tuple[object, int]:
+            tables = [tax._load_tax_tables_from_content(content) for _ in range(copies)]
+            return tables, sum(
+                len(t.brackets) for multi in tables for t in multi.year_tables
+            )
+
+        return build
+
+    return setup
+
+
+def _inflation_years() -> typing.Callable[[], tuple[object, int]]:
+    with open(_INFLATION_FILE, "r") as fh:
+        content = json.load(fh)
+
+    def build() -> tuple[object, int]:
+        inflations = inflation._load_all_measures(content)
+        return inflations, sum(len(i.years) for i in inflations.values())
+
+    return build
+
+
+BENCHMARKS: dict[str, Setup] = {
+    "calculate_tax[n=1]": _scalar_tax(1),
+    "calculate_tax[n=1e3]": _scalar_tax(1_000),
+    "calculate_tax[fixed_point,n=1e3]": _scalar_tax(
+        1_000, fixed_point.Arithmetic.FIXED_POINT
+    ),
+    "tax_units[n=1e3]": _scalar_tax_cents(1_000),
+    "calculate_tax_many[n=1]": _vector_tax(1),
+    "calculate_tax_many[n=1e3]": _vector_tax(1_000),
+    "calculate_tax_many[n=1e6]": _vector_tax(1_000_000),
+    "scenarios[s=100,n=1e5]": _scenarios(100, 100_000, batched=True),
+    "scenarios[looped,s=100,n=1e5]": _scenarios(100, 100_000, batched=False),
+    "inflation_adjust[all_years]": _adjust(),
+    "inflation_adjust[fixed_point,all_years]": _adjust(
+        fixed_point.Arithmetic.FIXED_POINT
+    ),
+    "adjusted_for_inflation[cold]": _adjusted_for_inflation(cached=False),
+    "adjusted_for_inflation[cached]": _adjusted_for_inflation(cached=True),
+    "load_tax_tables[cold]": _load(tax.load_tax_tables, "cold"),
+    "load_tax_tables[disk]": _load(tax.load_tax_tables, "disk"),
+    "load_tax_tables[memory]": _load(tax.load_tax_tables, "memory"),
+    "load_tax_tables[lazy,one_year]": _load_one_year_lazily,
+    "load_inflation[cold]": _load(inflation.load_inflation, "cold"),
+    "load_inflation[disk]": _load(inflation.load_inflation, "disk"),
+    "load_inflation[memory]": _load(inflation.load_inflation, "memory"),
+    "import[python]": _import(None),
+    "import[analysis.tax]": _import("analysis.tax"),
+    "import[analysis.tax_rates_over_time]": _import("analysis.tax_rates_over_time"),
+    "import[numpy,pandas,matplotlib.pyplot]": _import(
+        "numpy, pandas, matplotlib.pyplot"
+    ),
+}
+
+
+MEMORY_BENCHMARKS: dict[str, MemorySetup] = {
+    "memory[tax_brackets]": _tax_brackets(1),
+    "memory[tax_brackets,copies=100]": _tax_brackets(100),
+    "memory[inflation_years]": _inflation_years,
+}
+
+
+def run(
+    names: typing.Iterable[str], repeat: int = 5, min_time: float = 0.2
+) -> dict[str, dict[str, float]]:
+    # Each repeat loops the function until min_time has passed, and reports the
+    # time per call
+    results: dict[str, dict[str, float]] = {}
+    for name in names:
+        fn = BENCHMARKS[name]()
+        fn()
+        timings: list[float] = []
+        for _ in range(repeat):
+            loops = 0
+            started = time.perf_counter()
+            elapsed = 0.0
+            while elapsed < min_time or loops == 0:
+                fn()
+                loops += 1
+                elapsed = time.perf_counter() - started
+            timings.append(elapsed / loops)
+        results[name] = {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "repeat": repeat,
+        }
+
+    return results
+
+
+def measure_memory(names: typing.Iterable[str]) -> dict[str, dict[str, float]]:
+    # The bytes still allocated per record once they're built. Building once first
+    # keeps shared, one off allocations such as the parse caches out of it.
+    results: dict[str, dict[str, float]] = {}
+    for name in names:
+        build = MEMORY_BENCHMARKS[name]()
+        build()
+        tracemalloc.start()
+        try:
+            built, records = build()
+            allocated, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del built
+        results[name] = {"bytes": allocated / records, "records": records}
+
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+    key: str = "min",
+) -> list[str]:
+    # Timings compare the fastest repeat, which is the least noisy, against the
+    # baseline
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result[key] / baseline[name][key]
+        result["baseline_ratio"] = ratio
+        if ratio > tolerance:
+            measure = "slower" if key == "min" else "larger"
+            regressions.append(f"{name}: {ratio:.2f}x {measure} than baseline")
+
+    return regressions
+
+
+def _main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m analysis.benchmark")
+    parser.add_argument("-k", "--filter", default="", help="only names containing")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="slowdown vs baseline that counts as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    names = [n for n in BENCHMARKS if args.filter in n]
+    results = run(names, repeat=args.repeat, min_time=args.min_time)
+    memory = measure_memory([n for n in MEMORY_BENCHMARKS if args.filter in n])
+    regressions: list[str] = []
+    if args.baseline is not None:
+        with open(args.baseline, "r") as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline["benchmarks"], args.tolerance)
+        regressions += compare(
+            memory, baseline.get("memory", {}), args.tolerance, key="bytes"
+        )
+
+    for name, result in results.items():
+        print(f"{name:<36} {result['min'] * 1e6:>14,.1f} us{_ratio(result)}")
+    for name, result in memory.items():
+        print(f"{name:<36} {result['bytes']:>14,.1f} B/record{_ratio(result)}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if args.output is not None:
+        with open(args.output, "w") as fh:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "benchmarks": results,
+                    "memory": memory,
+                },
+                fh,
+                indent=2,
+            )
+
+    return 1 if len(regressions) > 0 else 0
+
+
+def _ratio(result: dict[str, float]) -> str:
+    ratio = result.get("baseline_ratio")
+    return f" ({ratio:.2f}x baseline)" if ratio is not None else ""
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+import numpy as np
+import numpy.typing as npt
+import typing
+from analysis import inflation, labels, tax
+
+
+@dataclass(frozen=True)
+class BracketCreep:
+    # Tax table years, ascending
+    years: npt.NDArray[np.int64]
+    measures: list[inflation.InflationMeasure]
+    # factors[m, i, j] converts years[i] dollars into years[j] dollars under
+    # measures[m]. NaN where the measure has no data for either year.
+    factors: npt.NDArray[np.float64]
+    # thresholds[m, i, j, k] is the start of bracket k in years[i], in years[j]
+    # dollars under measures[m]. NaN past a year's last bracket.
+    thresholds: npt.NDArray[np.float64]
+    # rates[i, k] is the rate of bracket k in years[i], padded the same way
+    rates: npt.NDArray[np.float64]
+
+    def factor(
+        self, measure: inflation.InflationMeasure, from_year: int, to_year: int
+    ) -> float:
+        m = self.measures.index(measure)
+        return float(self.factors[m, self._year(from_year), self._year(to_year)])
+
+    def thresholds_in(
+        self, measure: inflation.InflationMeasure, year: int
+    ) -> npt.NDArray[np.float64]:
+        # Every year's thresholds, in one year's dollars, as (years, brackets)
+        result: npt.NDArray[np.float64] = self.thresholds[
+            self.measures.index(measure), :, self._year(year)
+        ]
+        return result
+
+    def _year(self, year: int) -> int:
+        i = int(np.searchsorted(self.years, year))
+        assert i < len(self.years) and self.years[i] == year, f"No tax table for {year}"
+        return i
+
+
+def compute(
+    tax_tables: tax.MultiYearTaxTable,
+    inflations: typing.Mapping[inflation.InflationMeasure, inflation.Inflation],
+) -> BracketCreep:
+    # Every factor is a ratio of two cumulative price indices, so the whole cube is
+    # one broadcast division rather than an adjust call per pair of years
+    year_tables = sorted(tax_tables.year_tables, key=lambda t: t.year)
+    columns = tax.MultiYearTaxTable(year_tables=year_tables).columns
+    years = columns.years
+    measures = list(inflations)
+
+    index = np.array(
+        [[_price_index(inflations[m], int(y)) for y in years] for m in measures]
+    )
+    factors = index[:, None, :] / index[:, :, None]
+
+    # Scatter the flattened brackets into (years, most brackets), padded with NaN
+    counts = np.diff(columns.offsets)
+    rows = np.repeat(np.arange(len(years)), counts)
+    positions = np.arange(len(rows)) - np.repeat(columns.offsets[:-1], counts)
+    starts = np.full((len(years), int(counts.max(initial=0))), np.nan)
+    starts[rows, positions] = columns.columns.starts
+    rates = np.full(starts.shape, np.nan)
+    rates[rows, positions] = columns.columns.rates
+
+    return BracketCreep(
+        years=years,
+        measures=measures,
+        factors=factors,
+        thresholds=starts[None, :, None, :] * factors[:, :, :, None],
+        rates=rates,
+    )
+
+
+def _price_index(inflate: inflation.Inflation, year: int) -> float:
+    if len(inflate.years) == 0 or not (
+        inflate.years[-1].year <= year <= inflate.years[0].year + 1
+    ):
+        return np.nan
+    return float(inflate.price_index(year))
+
+
+if __name__ == "__main__":
+    tax_tables = tax.load_tax_tables()
+    creep = compute(
+        tax_tables,
+        {m: inflation.load_inflation(measure=m) for m in inflation.InflationMeasure},
+    )
+    latest = int(creep.years[-1])
+    for measure in creep.measures:
+        print(
+            f"Thresholds in {labels.financial_year(latest)} dollars ({measure.value})"
+        )
+        thresholds = creep.thresholds_in(measure, latest)
+        for i, year in enumerate(creep.years):
+            cells = ", ".join(f"${t:,.0f}" for t in thresholds[i] if t > 0)
+            print(f"  {labels.financial_year(int(year))}: {cells}")
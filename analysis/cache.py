@@ -0,0 +1,98 @@
+import hashlib
+import io
+import json
+import os
+import pickle
+import typing
+
+
+# Bump whenever the shape of the cached objects changes
+_FORMAT_VERSION = 4
+
+T = typing.TypeVar("T")
+
+
+def load_compiled(
+    fname: str,
+    name: str,
+    compile: typing.Callable[[typing.Any], T],
+    cache_dir: typing.Optional[str] = None,
+    parse: typing.Callable[[bytes], typing.Any] = json.loads,
+) -> T:
+    cache_fname = _cache_fname(fname, name, cache_dir)
+    stat = os.stat(fname)
+    cached = _read_cache(cache_fname)
+
+    if cached is not None:
+        header, payload = cached
+        if header["mtime_ns"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+            value = _load_payload(payload)
+            if value is not None:
+                return typing.cast(T, value)
+            cached = None
+
+    with open(fname, "rb") as fh:
+        source = fh.read()
+    digest = hashlib.sha256(source).hexdigest()
+
+    value = None
+    if cached is not None and cached[0]["sha256"] == digest:
+        # Touched but not changed, so just refresh the header
+        value = _load_payload(cached[1])
+    if value is None:
+        value = compile(parse(source))
+    _write_cache(cache_fname, stat, digest, value)
+
+    return typing.cast(T, value)
+
+
+def _cache_fname(fname: str, name: str, cache_dir: typing.Optional[str]) -> str:
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(fname), "__pycache__")
+    return os.path.join(cache_dir, f"{os.path.basename(fname)}.{name}.pickle")
+
+
+def _read_cache(
+    cache_fname: str,
+) -> typing.Optional[tuple[dict[str, typing.Any], io.BytesIO]]:
+    try:
+        with open(cache_fname, "rb") as fh:
+            content = fh.read()
+        payload = io.BytesIO(content)
+        header = pickle.load(payload)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if type(header) != dict or header.get("version") != _FORMAT_VERSION:
+        return None
+    return header, payload
+
+
+def _load_payload(payload: io.BytesIO) -> typing.Optional[typing.Any]:
+    # None when the payload is truncated, or pickled from classes that have since
+    # changed, so that it's compiled again. Compiled values are never None.
+    try:
+        return pickle.load(payload)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _write_cache(
+    cache_fname: str, stat: os.stat_result, digest: str, value: typing.Any
+) -> None:
+    header = {
+        "version": _FORMAT_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest,
+    }
+    tmp_fname = f"{cache_fname}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_fname), exist_ok=True)
+        with open(tmp_fname, "wb") as fh:
+            pickle.dump(header, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_fname, cache_fname)
+    except OSError:
+        # The cache is only an optimisation, so a read only data directory is fine
+        pass
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+import numpy as np
+import numpy.typing as npt
+import typing
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+# Rows of the block backing every set of columns
+_STARTS, _ENDS, _RATES = range(3)
+_COLUMNS = ["start", "end", "rate"]
+
+
+class _Bracket(typing.Protocol):
+    @property
+    def start(self) -> typing.Any: ...
+
+    @property
+    def end(self) -> typing.Optional[typing.Any]: ...
+
+    @property
+    def rate(self) -> typing.Any: ...
+
+
+class _Table(typing.Protocol):
+    @property
+    def year(self) -> int: ...
+
+    @property
+    def brackets(self) -> typing.Sequence[_Bracket]: ...
+
+
+@dataclass(frozen=True)
+class TaxColumns:
+    # A (3, brackets) block, with one contiguous row each for the starts, ends and
+    # rates. The uncapped top bracket ends at infinity.
+    data: npt.NDArray[np.float64]
+
+    @property
+    def starts(self) -> npt.NDArray[np.float64]:
+        row: npt.NDArray[np.float64] = self.data[_STARTS]
+        return row
+
+    @property
+    def ends(self) -> npt.NDArray[np.float64]:
+        row: npt.NDArray[np.float64] = self.data[_ENDS]
+        return row
+
+    @property
+    def rates(self) -> npt.NDArray[np.float64]:
+        row: npt.NDArray[np.float64] = self.data[_RATES]
+        return row
+
+    def to_numpy(self) -> npt.NDArray[np.float64]:
+        return self.data
+
+    def to_pandas(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        # The transpose of the block is what pandas stores, so nothing is copied
+        return pd.DataFrame(self.data.T, columns=_COLUMNS, copy=False)
+
+
+@dataclass(frozen=True)
+class MultiYearTaxColumns:
+    # Every table's brackets, flattened into one block. The brackets for years[i] are
+    # columns offsets[i] to offsets[i + 1].
+    years: npt.NDArray[np.int64]
+    offsets: npt.NDArray[np.int64]
+    columns: TaxColumns
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def table(self, i: int) -> TaxColumns:
+        return TaxColumns(
+            data=self.columns.data[:, self.offsets[i] : self.offsets[i + 1]]
+        )
+
+    def bracket_years(self) -> npt.NDArray[np.int64]:
+        return np.repeat(self.years, np.diff(self.offsets))
+
+    def to_numpy(self) -> npt.NDArray[np.float64]:
+        return self.columns.data
+
+    def to_pandas(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.columns.data.T,
+            columns=_COLUMNS,
+            index=pd.Index(self.bracket_years(), name="year"),
+            copy=False,
+        )
+
+
+def from_brackets(brackets: typing.Sequence[_Bracket]) -> TaxColumns:
+    data = np.empty((3, len(brackets)))
+    data[_STARTS] = [float(b.start) for b in brackets]
+    data[_ENDS] = [float(b.end) if b.end is not None else np.inf for b in brackets]
+    data[_RATES] = [float(b.rate) for b in brackets]
+    # Tables cache their columns and hand out views of them, so nothing may write
+    # through one
+    data.setflags(write=False)
+    return TaxColumns(data=data)
+
+
+def from_tables(tables: typing.Sequence[_Table]) -> MultiYearTaxColumns:
+    counts = [len(t.brackets) for t in tables]
+    years = np.array([t.year for t in tables], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    years.setflags(write=False)
+    offsets.setflags(write=False)
+    return MultiYearTaxColumns(
+        years=years,
+        offsets=offsets,
+        columns=from_brackets([b for t in tables for b in t.brackets]),
+    )
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+import bisect
+import decimal
+import typing
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
+
+_ZERO = decimal.Decimal(0)
+_NEGATIVE_INFINITY = decimal.Decimal("-Infinity")
+_INFINITY = decimal.Decimal("Infinity")
+
+
+class _Bracket(typing.Protocol):
+    @property
+    def start(self) -> decimal.Decimal: ...
+
+    @property
+    def end(self) -> typing.Optional[decimal.Decimal]: ...
+
+    @property
+    def rate(self) -> decimal.Decimal: ...
+
+
+@dataclass(frozen=True)
+class PiecewiseLinear:
+    # Segment i covers [breakpoints[i], breakpoints[i + 1]), or up to infinity for the
+    # last, and is slopes[i] * x + intercepts[i] on it. The first breakpoint is
+    # -infinity.
+    breakpoints: list[decimal.Decimal]
+    slopes: list[decimal.Decimal]
+    intercepts: list[decimal.Decimal]
+
+    def __post_init__(self) -> None:
+        assert len(self.breakpoints) == len(self.slopes) == len(self.intercepts)
+        assert len(self.breakpoints) > 0
+        assert self.breakpoints[0] == _NEGATIVE_INFINITY
+        assert all(a < b for a, b in zip(self.breakpoints, self.breakpoints[1:]))
+
+    def __call__(self, x: decimal.Decimal) -> decimal.Decimal:
+        i = bisect.bisect_right(self.breakpoints, x) - 1
+        return self.slopes[i] * x + self.intercepts[i]
+
+    def evaluate_many(
+        self, xs: "npt.NDArray[np.number[typing.Any]]"
+    ) -> "npt.NDArray[np.float64]":
+        import numpy as np
+
+        breakpoints = np.array([float(b) for b in self.breakpoints])
+        slopes = np.array([float(s) for s in self.slopes])
+        intercepts = np.array([float(c) for c in self.intercepts])
+        i = np.searchsorted(breakpoints, xs, side="right") - 1
+        result: npt.NDArray[np.float64] = slopes[i] * xs + intercepts[i]
+        return result
+
+    def segments(
+        self,
+    ) -> typing.Iterator[
+        tuple[decimal.Decimal, decimal.Decimal, decimal.Decimal, decimal.Decimal]
+    ]:
+        # (start, end, slope, intercept) of each segment, end exclusive
+        ends = [*self.breakpoints[1:], _INFINITY]
+        yield from zip(self.breakpoints, ends, self.slopes, self.intercepts)
+
+    def derivative(self) -> "PiecewiseLinear":
+        # Ignores the jumps between segments
+        return PiecewiseLinear(
+            breakpoints=self.breakpoints,
+            slopes=[_ZERO] * len(self.slopes),
+            intercepts=self.slopes,
+        )
+
+    def integral(self, lo: decimal.Decimal, hi: decimal.Decimal) -> decimal.Decimal:
+        assert lo <= hi
+        total = _ZERO
+        for start, end, slope, intercept in self.segments():
+            a, b = max(start, lo), min(end, hi)
+            if a >= b:
+                continue
+            total += slope * (b * b - a * a) / 2 + intercept * (b - a)
+
+        return total
+
+
+@dataclass(frozen=True)
+class EffectiveRateCurve:
+    # tax(x) / x, which is slope + intercept / x on each segment of the tax curve.
+    # Only defined for positive incomes.
+    tax: PiecewiseLinear
+
+    def __call__(self, x: decimal.Decimal) -> decimal.Decimal:
+        assert x > 0
+        return self.tax(x) / x
+
+    def evaluate_many(
+        self, xs: "npt.NDArray[np.number[typing.Any]]"
+    ) -> "npt.NDArray[np.float64]":
+        import numpy as np
+
+        assert np.all(xs > 0)
+        result: npt.NDArray[np.float64] = np.divide(self.tax.evaluate_many(xs), xs)
+        return result
+
+    def integral(self, lo: decimal.Decimal, hi: decimal.Decimal) -> decimal.Decimal:
+        assert 0 < lo <= hi
+        total = _ZERO
+        for start, end, slope, intercept in self.tax.segments():
+            a, b = max(start, lo), min(end, hi)
+            if a >= b:
+                continue
+            total += slope * (b - a) + intercept * (b / a).ln()
+
+        return total
+
+    def average(self, lo: decimal.Decimal, hi: decimal.Decimal) -> decimal.Decimal:
+        assert lo < hi
+        return self.integral(lo, hi) / (hi - lo)
+
+
+def tax_curve(brackets: typing.Sequence[_Bracket]) -> PiecewiseLinear:
+    # Follows TaxBracket.compute_tax, which taxes (x - start + 1) * rate, capped at
+    # the bracket's end. So tax jumps by the rate at each bracket's start, and is flat
+    # from one bracket's end to the next one's start.
+    breakpoints = [_NEGATIVE_INFINITY]
+    slopes = [_ZERO]
+    intercepts = [_ZERO]
+    below = _ZERO
+    for i, bracket in enumerate(brackets):
+        breakpoints.append(bracket.start)
+        slopes.append(bracket.rate)
+        intercepts.append(below + (1 - bracket.start) * bracket.rate)
+        if bracket.end is None:
+            break
+
+        below += (bracket.end - bracket.start + 1) * bracket.rate
+        if i + 1 == len(brackets) or brackets[i + 1].start > bracket.end:
+            breakpoints.append(bracket.end)
+            slopes.append(_ZERO)
+            intercepts.append(below)
+
+    return PiecewiseLinear(
+        breakpoints=breakpoints, slopes=slopes, intercepts=intercepts
+    )
@@ -1,47 +1,77 @@
 import decimal
-import matplotlib.pyplot as plt
-import pandas as pd
 import typing
-from analysis import inflation, labels, tax
+from analysis import incremental, inflation, instrument, labels, tax
+
+if typing.TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+InflationAdjustment = typing.Callable[[int, decimal.Decimal], decimal.Decimal]
 
 
 def _show_tax_paid(
     income: int, inflation_adjusted: typing.Optional[inflation.InflationMeasure] = None
 ) -> None:
-    d_income = decimal.Decimal(income)
     tax_tables = tax.load_tax_tables()
-    inflation_adjustment: typing.Callable[[int, decimal.Decimal], decimal.Decimal] = (
-        lambda _, x: x
-    )
+    inflation_adjustment: InflationAdjustment = lambda _, x: x
 
     if inflation_adjusted is not None:
         inflate = inflation.load_inflation(measure=inflation_adjusted)
         tax_tables = tax_tables.adjusted_for_inflation(inflate)
-        to_year = max(t.year for t in tax_tables.year_tables)
+        to_year = tax_tables.latest_year
         # inflation_adjustment = lambda y, x: inflate.adjust(
         # amount=x, from_year=y, to_year=to_year
         # )
 
-    fy_index = []
-    rows = []
+    import matplotlib.pyplot as plt
+
+    _plot_tax_paid(plt.figure(), tax_tables, income, inflation_adjustment)
+    plt.show()
+
+
+def _plot_tax_paid(
+    fig: "Figure",
+    tax_tables: tax.MultiYearTaxTable,
+    income: int,
+    inflation_adjustment: InflationAdjustment = lambda _, x: x,
+) -> None:
+    d_income = decimal.Decimal(income)
+    incomes = []
+    rates = []
     for year in reversed(tax_tables.year_tables):
-        fy_index.append(labels.financial_year(year.year))
         adjusted_income = inflation_adjustment(year.year, d_income)
         tax_amount = year.calculate_tax(adjusted_income)
-        rows.append(
-            {
-                "income": int(adjusted_income),
-                "tax": int(tax_amount),
-                "etr": float(tax_amount / adjusted_income * 100),
-            }
+        incomes.append(int(adjusted_income))
+        rates.append(
+            incremental.EffectiveRate(
+                year=year.year, tax=tax_amount, rate=tax_amount / adjusted_income
+            )
         )
 
-    _, ax = plt.subplots()
-    df = pd.DataFrame(rows, index=fy_index)
+    _plot_effective_rates(fig, rates, incomes)
+
+
+@instrument.timed("render.effective_tax_over_time")
+def _plot_effective_rates(
+    fig: "Figure",
+    rates: typing.Sequence[incremental.EffectiveRate],
+    incomes: typing.Sequence[int],
+) -> None:
+    # Each year's rate is on the income at the same position
+    import pandas as pd
+
+    ax = fig.subplots()
+    df = pd.DataFrame(
+        {
+            "income": incomes,
+            "tax": [int(r.tax) for r in rates],
+            "etr": [float(r.rate * 100) for r in rates],
+        },
+        index=[labels.financial_year(r.year) for r in rates],
+    )
     df.plot(secondary_y=["etr"], ax=ax)
     ax.set_ylim(bottom=0)
     ax.right_ax.set_ylim(bottom=0)  # type: ignore[attr-defined]
-    plt.show()
 
 
 if __name__ == "__main__":
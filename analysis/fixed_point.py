@@ -0,0 +1,329 @@
+from dataclasses import dataclass
+import bisect
+import decimal
+import enum
+import typing
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+    from analysis import inflation, tax
+
+
+# Integer arithmetic for tax and inflation calculations. The rounding policy is:
+#
+# - Money is held as whole cents. Decimal amounts are rounded to the nearest cent,
+#   ties to even, which is the decimal module's default rounding.
+# - A tax table's rates are held as integers scaled by 10 ** digits, where digits is
+#   the most decimal places of any of its rates, up to MAX_RATE_DIGITS. Rates with
+#   more places are rounded the same way as money.
+# - Tax is then exact, in units of a cent / 10 ** digits. Nothing is rounded unless
+#   it's converted to whole cents.
+# - Inflation adjustments are exact until the end, where they are rounded to the
+#   cent once.
+#
+# So whenever incomes, bracket boundaries and rates fit without rounding, as all of
+# data/aus_tax_table.json does, tax is identical to the Decimal path. Adjusted
+# amounts are identical to the Decimal path rounded to the cent.
+
+MAX_RATE_DIGITS = 6
+_CENTS = 100
+# One dollar, for the +1 convention in TaxBracket.compute_tax
+_DOLLAR = _CENTS
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+# The most tax units that float64 holds exactly, along with every integer below
+FLOAT_EXACT_UNITS = 2**53
+
+
+class Arithmetic(enum.Enum):
+    DECIMAL = "decimal"
+    FIXED_POINT = "fixed_point"
+
+
+class _Bracket(typing.Protocol):
+    @property
+    def start(self) -> decimal.Decimal: ...
+
+    @property
+    def end(self) -> typing.Optional[decimal.Decimal]: ...
+
+    @property
+    def rate(self) -> decimal.Decimal: ...
+
+
+class _Year(typing.Protocol):
+    @property
+    def year(self) -> int: ...
+
+    @property
+    def achange(self) -> decimal.Decimal: ...
+
+
+def to_cents(amount: decimal.Decimal) -> int:
+    return int((amount * _CENTS).to_integral_value(decimal.ROUND_HALF_EVEN))
+
+
+def from_cents(cents: int) -> decimal.Decimal:
+    return decimal.Decimal(cents).scaleb(-2)
+
+
+def _is_cents(amount: decimal.Decimal) -> bool:
+    return amount.scaleb(2) % 1 == 0
+
+
+def _divide_half_even(numerator: int, denominator: int) -> int:
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (
+        2 * remainder == denominator and quotient % 2 == 1
+    ):
+        quotient += 1
+    return quotient
+
+
+@dataclass(frozen=True)
+class FixedPointTaxTable:
+    digits: int
+    # In cents. The uncapped top bracket has an end of None.
+    starts: list[int]
+    ends: list[typing.Optional[int]]
+    # Scaled by 10 ** digits
+    rates: list[int]
+    # In units, the tax on every bracket below each bracket
+    cumulative_tax: list[int]
+    # Whether the table was converted without any rounding
+    exact: bool
+    # Whether it's also exact in whole dollars
+    whole_dollars: bool
+
+    @property
+    def units_per_dollar(self) -> int:
+        scale: int = 10**self.digits
+        return _CENTS * scale
+
+    def tax_units(self, income_cents: int) -> int:
+        i = bisect.bisect_right(self.starts, income_cents) - 1
+        if i < 0:
+            return 0
+
+        end = self.ends[i]
+        capped = income_cents if end is None else min(income_cents, end)
+        return (
+            self.cumulative_tax[i] + (capped - self.starts[i] + _DOLLAR) * self.rates[i]
+        )
+
+    def income_range(
+        self, per_dollar: int = _CENTS, max_units: int = _INT64_MAX
+    ) -> tuple[int, int]:
+        # The incomes, inclusive, that tax_units_many can work on without overflowing
+        # and that are taxed at most max_units. All of an income is taxed at no more
+        # than the top rate, from a first bracket starting at 0, and the lowest income
+        # is offset by at most the last start.
+        step = _CENTS // per_dollar
+        top_rate = max(self.rates)
+        return (
+            _INT64_MIN + self.starts[-1] // step,
+            max_units // top_rate - per_dollar if top_rate > 0 else _INT64_MAX,
+        )
+
+    def fits_int64(
+        self, incomes: "npt.NDArray[np.int64]", per_dollar: int = _CENTS
+    ) -> bool:
+        if incomes.size == 0:
+            return True
+        lo, hi = self.income_range(per_dollar)
+        return lo <= int(incomes.min()) and int(incomes.max()) <= hi
+
+    def tax_units_many(
+        self, incomes: "npt.NDArray[np.int64]", per_dollar: int = _CENTS
+    ) -> "npt.NDArray[np.int64]":
+        import numpy as np
+
+        # Incomes are in cents, or whole dollars with per_dollar=1 if every boundary
+        # is as well. Tax is in units of 1 / per_dollar / 10 ** digits dollars.
+        assert per_dollar in (1, _CENTS)
+        assert per_dollar == _CENTS or self.whole_dollars
+        assert self.fits_int64(incomes, per_dollar), "Tax would overflow int64"
+        step = _CENTS // per_dollar
+        tax_units = np.zeros(incomes.shape, dtype=np.int64)
+        taxed = np.empty(incomes.shape, dtype=np.int64)
+        for start, end, rate in zip(self.starts, self.ends, self.rates):
+            if rate == 0:
+                continue
+            np.subtract(incomes, (start - _DOLLAR) // step, out=taxed)
+            np.maximum(taxed, 0, out=taxed)
+            if end is not None:
+                np.minimum(taxed, (end - start + _DOLLAR) // step, out=taxed)
+            taxed *= rate
+            tax_units += taxed
+
+        return tax_units
+
+    def calculate_tax(self, taxable_income: decimal.Decimal) -> decimal.Decimal:
+        units = self.tax_units(to_cents(taxable_income))
+        return decimal.Decimal(units).scaleb(-2 - self.digits)
+
+    def calculate_tax_cents(self, taxable_income: decimal.Decimal) -> int:
+        units = self.tax_units(to_cents(taxable_income))
+        return _divide_half_even(units, 10**self.digits)
+
+
+def compile_tax_table(brackets: typing.Sequence[_Bracket]) -> FixedPointTaxTable:
+    digits = min(
+        MAX_RATE_DIGITS,
+        max(max(0, -int(b.rate.as_tuple().exponent)) for b in brackets),
+    )
+    starts = [to_cents(b.start) for b in brackets]
+    ends = [to_cents(b.end) if b.end is not None else None for b in brackets]
+    rates = [
+        int(b.rate.scaleb(digits).to_integral_value(decimal.ROUND_HALF_EVEN))
+        for b in brackets
+    ]
+    cumulative_tax = [0]
+    for start, end, rate in zip(starts[:-1], ends[:-1], rates[:-1]):
+        assert end is not None
+        cumulative_tax.append(cumulative_tax[-1] + (end - start + _DOLLAR) * rate)
+
+    exact = all(
+        _is_cents(b.start)
+        and (b.end is None or _is_cents(b.end))
+        and b.rate.scaleb(digits) % 1 == 0
+        for b in brackets
+    )
+    whole_dollars = exact and all(
+        s % _CENTS == 0 and (e is None or e % _CENTS == 0) for s, e in zip(starts, ends)
+    )
+    return FixedPointTaxTable(
+        digits=digits,
+        starts=starts,
+        ends=ends,
+        rates=rates,
+        cumulative_tax=cumulative_tax,
+        exact=exact,
+        whole_dollars=whole_dollars,
+    )
+
+
+@dataclass(frozen=True)
+class FixedPointInflation:
+    digits: int
+    # Products of (1 + achange) * 10 ** digits for every year before the key
+    price_index: dict[int, int]
+
+    def adjust_cents(self, cents: int, from_year: int, to_year: int) -> int:
+        # The index is a product of integers, so this ratio divides exactly
+        ratio = self.price_index[to_year] // self.price_index[from_year]
+        return _divide_half_even(
+            cents * ratio, 10 ** (self.digits * (to_year - from_year))
+        )
+
+    def adjust(
+        self, amount: decimal.Decimal, from_year: int, to_year: int
+    ) -> decimal.Decimal:
+        return from_cents(self.adjust_cents(to_cents(amount), from_year, to_year))
+
+
+def compile_inflation(years: typing.Sequence[_Year]) -> FixedPointInflation:
+    if len(years) == 0:
+        return FixedPointInflation(digits=0, price_index={})
+
+    digits = max(max(0, -int(y.achange.as_tuple().exponent)) for y in years)
+    factors = {y.year: int((y.achange + 1).scaleb(digits)) for y in years}
+    price_index: dict[int, int] = {}
+    level = 1
+    for year in range(min(factors), max(factors) + 2):
+        price_index[year] = level
+        level *= factors.get(year, 10**digits)
+
+    return FixedPointInflation(digits=digits, price_index=price_index)
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    description: str
+    expected: decimal.Decimal
+    actual: decimal.Decimal
+
+
+def verify(
+    tax_tables: "tax.MultiYearTaxTable",
+    inflate: typing.Optional["inflation.Inflation"] = None,
+) -> list[Mismatch]:
+    # Checks fixed point against Decimal arithmetic for incomes on, and either side
+    # of, every bracket boundary, through the scalar and vector paths. With inflation
+    # data, every boundary is also adjusted between every pair of years.
+    import numpy as np
+
+    mismatches: list[Mismatch] = []
+    for table in tax_tables.year_tables:
+        incomes = sorted(
+            {
+                amount + offset
+                for b in table.brackets
+                for amount in ([b.start] if b.end is None else [b.start, b.end])
+                for offset in (-1, 0, 1)
+                if amount + offset >= 0
+            }
+        )
+        for income in incomes:
+            expected = table.calculate_tax(income)
+            # The compiled table itself, which calculate_tax only uses if it's exact
+            actual = table.fixed_point_table.calculate_tax(income)
+            if actual != expected:
+                mismatches.append(
+                    Mismatch(f"tax in {table.year} on {income}", expected, actual)
+                )
+
+        if table.fixed_point_table.whole_dollars:
+            whole = [i for i in incomes if i % 1 == 0]
+            vector = table.calculate_tax_many(np.array(whole, dtype=np.int64))
+            for income, actual_float in zip(whole, vector):
+                expected = table.calculate_tax(income)
+                if actual_float != float(expected):
+                    mismatches.append(
+                        Mismatch(
+                            f"vector tax in {table.year} on {income}",
+                            expected,
+                            decimal.Decimal(actual_float),
+                        )
+                    )
+
+    if inflate is not None:
+        amounts = {b.end for t in tax_tables.year_tables for b in t.brackets if b.end}
+        years = [y.year for y in inflate.years] + [inflate.years[0].year + 1]
+        for amount in sorted(amounts):
+            for from_year in years:
+                for to_year in years:
+                    if from_year > to_year:
+                        continue
+                    expected = inflate.adjust(amount, from_year, to_year).quantize(
+                        decimal.Decimal("0.01"), rounding=decimal.ROUND_HALF_EVEN
+                    )
+                    actual = inflate.adjust(
+                        amount, from_year, to_year, arithmetic=Arithmetic.FIXED_POINT
+                    )
+                    if actual != expected:
+                        mismatches.append(
+                            Mismatch(
+                                f"{amount} from {from_year} to {to_year}",
+                                expected,
+                                actual,
+                            )
+                        )
+
+    return mismatches
+
+
+if __name__ == "__main__":
+    # Run as a script this module is __main__, whose Arithmetic isn't the one that
+    # tax & inflation compare against
+    from analysis import fixed_point, inflation, tax
+
+    tax_tables = tax.load_tax_tables()
+    for measure in inflation.InflationMeasure:
+        mismatches = fixed_point.verify(
+            tax_tables, inflation.load_inflation(measure=measure)
+        )
+        print(f"{measure.value}: {len(mismatches)} mismatches")
+        for m in mismatches:
+            print(f"  {m.description}: expected {m.expected}, got {m.actual}")
@@ -0,0 +1,93 @@
+import numpy as np
+import numpy.typing as npt
+import typing
+from analysis import labels
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa  # type: ignore[import-not-found, unused-ignore]
+    from analysis import inflation, tax
+
+
+# Every column is built as a whole. Years & labels come from the columnar years, and
+# float columns from a copy of the cached bracket block or one conversion of all the
+# Decimals. Exact columns hold the Decimals themselves, and the uncapped top bracket
+# ends at None, where the float columns end it at infinity as columnar does.
+
+
+def tax_table_frame(
+    tax_tables: "tax.MultiYearTaxTable", exact: bool = False
+) -> "pd.DataFrame":
+    # One row per bracket, in the order of year_tables
+    import pandas as pd
+
+    return pd.DataFrame(_tax_columns(tax_tables, exact), copy=False)
+
+
+def tax_table_arrow(tax_tables: "tax.MultiYearTaxTable") -> "pa.Table":
+    pa = _import_pyarrow()
+    return pa.table(_tax_columns(tax_tables, exact=True))
+
+
+def inflation_frame(
+    inflate: "inflation.Inflation", exact: bool = False
+) -> "pd.DataFrame":
+    # One row per year, in the order of years
+    import pandas as pd
+
+    return pd.DataFrame(_inflation_columns(inflate, exact), copy=False)
+
+
+def inflation_arrow(inflate: "inflation.Inflation") -> "pa.Table":
+    pa = _import_pyarrow()
+    return pa.table(_inflation_columns(inflate, exact=True))
+
+
+def _tax_columns(
+    tax_tables: "tax.MultiYearTaxTable", exact: bool
+) -> dict[str, npt.NDArray[typing.Any]]:
+    columns = tax_tables.columns
+    counts = np.diff(columns.offsets)
+    result: dict[str, npt.NDArray[typing.Any]] = {
+        "year": np.repeat(columns.years, counts),
+        "fy": np.repeat(labels.financial_years(columns.years), counts),
+    }
+    if not exact:
+        # The block is the table's cached one, which frames mustn't share
+        data = columns.columns.data.copy()
+        return {**result, "start": data[0], "end": data[1], "rate": data[2]}
+
+    brackets = [b for t in tax_tables.year_tables for b in t.brackets]
+    return {
+        **result,
+        "start": _objects([b.start for b in brackets]),
+        "end": _objects([b.end for b in brackets]),
+        "rate": _objects([b.rate for b in brackets]),
+    }
+
+
+def _inflation_columns(
+    inflate: "inflation.Inflation", exact: bool
+) -> dict[str, npt.NDArray[typing.Any]]:
+    years = np.array([y.year for y in inflate.years], dtype=np.int64)
+    achanges = _objects([y.achange for y in inflate.years])
+    return {
+        "year": years,
+        "fy": labels.financial_years(years),
+        "achange": achanges if exact else achanges.astype(np.float64),
+    }
+
+
+def _objects(values: list[typing.Any]) -> npt.NDArray[np.object_]:
+    # np.array would try to find a common numeric type for the Decimals
+    result = np.empty(len(values), dtype=object)
+    result[:] = values
+    return result
+
+
+def _import_pyarrow() -> typing.Any:
+    try:
+        import pyarrow as pa  # type: ignore[import-not-found, unused-ignore]
+    except ImportError as e:
+        raise ImportError("Exporting to Arrow needs pyarrow installed") from e
+    return pa
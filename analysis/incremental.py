@@ -0,0 +1,192 @@
+from dataclasses import dataclass
+import decimal
+import functools
+import hashlib
+import os
+import pickle
+import typing
+from analysis import inflation, tax
+
+
+# Bump whenever the shape of the stored results changes
+_FORMAT_VERSION = 1
+
+T = typing.TypeVar("T")
+Key = tuple[typing.Any, ...]
+
+
+def fingerprint(*inputs: object) -> str:
+    # The reprs of Decimals, brackets & years are exact, so equal inputs give equal
+    # fingerprints
+    return hashlib.sha256(repr(inputs).encode()).hexdigest()
+
+
+class Store:
+    # Results kept between runs, each with the fingerprint of the inputs it was
+    # computed from. Held in memory, and written to fname by save.
+
+    def __init__(self, fname: typing.Optional[str] = None) -> None:
+        self.fname = fname
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[Key, tuple[str, typing.Any]] = (
+            _read_store(fname) if fname is not None else {}
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Key, fingerprint: str) -> typing.Optional[typing.Any]:
+        # None when there's no result for key, or it was computed from other inputs
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != fingerprint:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Key, fingerprint: str, value: typing.Any) -> None:
+        assert value is not None
+        self._entries[key] = (fingerprint, value)
+
+    def save(self) -> None:
+        assert self.fname is not None
+        tmp_fname = f"{self.fname}.{os.getpid()}.tmp"
+        with open(tmp_fname, "wb") as fh:
+            pickle.dump({"version": _FORMAT_VERSION}, fh, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(self._entries, fh, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_fname, self.fname)
+
+
+def _read_store(fname: str) -> dict[Key, tuple[str, typing.Any]]:
+    try:
+        with open(fname, "rb") as fh:
+            header = pickle.load(fh)
+            if type(header) != dict or header.get("version") != _FORMAT_VERSION:
+                return {}
+            entries = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+
+    return entries if type(entries) == dict else {}
+
+
+@dataclass(frozen=True)
+class Node(typing.Generic[T]):
+    value: T
+    # Of every input the value was computed from
+    fingerprint: str
+
+
+@dataclass(frozen=True)
+class EffectiveRate:
+    year: int
+    tax: decimal.Decimal
+    rate: decimal.Decimal
+
+
+class Pipeline:
+    # Each result is keyed by what it is, and reused from the store for as long as
+    # the fingerprint of what it reads is unchanged. The fingerprints only cover the
+    # inputs each result actually reads, so appending a year of inflation or a tax
+    # table only recomputes the results that read it.
+
+    def __init__(self, store: Store) -> None:
+        self.store = store
+        self.computed: list[Key] = []
+        self.reused: list[Key] = []
+
+    def node(
+        self, key: Key, inputs: typing.Sequence[object], compute: typing.Callable[[], T]
+    ) -> Node[T]:
+        current = fingerprint(key, *inputs)
+        value = self.store.get(key, current)
+        if value is not None:
+            self.reused.append(key)
+            return Node(value=typing.cast(T, value), fingerprint=current)
+
+        value = compute()
+        self.store.put(key, current, value)
+        self.computed.append(key)
+        return Node(value=value, fingerprint=current)
+
+    def table(self, table: tax.TaxTable) -> Node[tax.TaxTable]:
+        # A source table, which is only fingerprinted
+        return Node(value=table, fingerprint=fingerprint(table.year, table.brackets))
+
+    def adjusted_table(
+        self,
+        table: tax.TaxTable,
+        inflate: inflation.Inflation,
+        measure: inflation.InflationMeasure,
+        to_year: int,
+    ) -> Node[tax.TaxTable]:
+        # The adjustment only divides the price index at to_year by the one at the
+        # table's year. Appending a year doesn't change the index for earlier years.
+        return self.node(
+            ("adjusted_table", measure.value, table.year, to_year),
+            [
+                self.table(table).fingerprint,
+                inflate.price_index(table.year),
+                inflate.price_index(to_year),
+            ],
+            lambda: table.adjusted_for_inflation(inflate, to_year=to_year),
+        )
+
+    def year_tables(
+        self,
+        tax_tables: tax.MultiYearTaxTable,
+        inflations: typing.Mapping[inflation.InflationMeasure, inflation.Inflation],
+        measure: typing.Optional[inflation.InflationMeasure],
+    ) -> list[Node[tax.TaxTable]]:
+        # In the order of tax_tables.year_tables. Adjusted tables are in the dollars
+        # of the latest year, so a new latest table changes every one of them.
+        if measure is None:
+            return [self.table(t) for t in tax_tables.year_tables]
+
+        to_year = tax_tables.latest_year
+        return [
+            self.adjusted_table(t, inflations[measure], measure, to_year)
+            for t in tax_tables.year_tables
+        ]
+
+    def effective_rates(
+        self,
+        tables: typing.Sequence[Node[tax.TaxTable]],
+        income: int,
+        measure: typing.Optional[inflation.InflationMeasure],
+    ) -> Node[list[EffectiveRate]]:
+        # By year, ascending. Each year is its own result.
+        years = sorted(tables, key=lambda n: n.value.year)
+        rates = [
+            self.node(
+                ("effective_rate", _measure_key(measure), t.value.year, income),
+                [t.fingerprint, income],
+                functools.partial(_effective_rate, t.value, income),
+            )
+            for t in years
+        ]
+        return Node(
+            value=[r.value for r in rates],
+            fingerprint=fingerprint(*[r.fingerprint for r in rates]),
+        )
+
+
+def combine(tables: typing.Sequence[Node[tax.TaxTable]]) -> Node[tax.MultiYearTaxTable]:
+    return Node(
+        value=tax.MultiYearTaxTable(year_tables=[t.value for t in tables]),
+        fingerprint=fingerprint(*[t.fingerprint for t in tables]),
+    )
+
+
+def _effective_rate(table: tax.TaxTable, income: int) -> EffectiveRate:
+    tax_amount = table.calculate_tax(decimal.Decimal(income))
+    return EffectiveRate(
+        year=table.year,
+        tax=tax_amount,
+        rate=tax_amount / income if income > 0 else decimal.Decimal(0),
+    )
+
+
+def _measure_key(measure: typing.Optional[inflation.InflationMeasure]) -> str:
+    return measure.value if measure is not None else "nominal"
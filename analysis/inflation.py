@@ -1,9 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import decimal
 import enum
+import functools
 import json
 import typing
-from analysis import parse
+from analysis import fixed_point, instrument, parse, registry
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa  # type: ignore[import-not-found, unused-ignore]
 
 
 class InflationMeasure(enum.Enum):
@@ -11,7 +16,7 @@ class InflationMeasure(enum.Enum):
     WPI = "WPI"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InflationYear:
     year: int
     achange: decimal.Decimal
@@ -20,34 +25,90 @@ class InflationYear:
 @dataclass(frozen=True)
 class Inflation:
     years: list[InflationYear]
+    _price_index: dict[int, decimal.Decimal] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_price_index", _build_price_index(self.years))
+
+    def price_index(self, year: int) -> decimal.Decimal:
+        return self._price_index[year]
 
+    @instrument.timed("inflation.adjust")
     def adjust(
-        self, amount: decimal.Decimal, from_year: int, to_year: int
+        self,
+        amount: decimal.Decimal,
+        from_year: int,
+        to_year: int,
+        arithmetic: fixed_point.Arithmetic = fixed_point.Arithmetic.DECIMAL,
     ) -> decimal.Decimal:
         assert from_year <= to_year
         assert to_year <= self.years[0].year + 1
         assert from_year >= self.years[-1].year
+        if arithmetic == fixed_point.Arithmetic.FIXED_POINT:
+            return self.fixed_point_index.adjust(amount, from_year, to_year)
         if from_year == to_year:
             return amount
 
-        for year in self.years:
-            if to_year <= year.year:
-                continue
-            if from_year > year.year:
-                break
-            amount *= year.achange + 1
+        to_index = self._price_index[to_year]
+        # The ratio divides out exactly, so it never has more digits than the index
+        with decimal.localcontext(prec=len(to_index.as_tuple().digits)):
+            ratio = to_index / self._price_index[from_year]
+
+        return amount * ratio
+
+    @functools.cached_property
+    def fixed_point_index(self) -> fixed_point.FixedPointInflation:
+        return fixed_point.compile_inflation(self.years)
+
+    def to_dataframe(self, exact: bool = False) -> "pd.DataFrame":
+        # One row per year, with float changes or, if exact, the Decimals
+        from analysis import frames
+
+        return frames.inflation_frame(self, exact)
 
-        return amount
+    def to_arrow(self) -> "pa.Table":
+        # Needs pyarrow, which is optional
+        from analysis import frames
 
+        return frames.inflation_arrow(self)
 
+
+def _build_price_index(years: list[InflationYear]) -> dict[int, decimal.Decimal]:
+    if len(years) == 0:
+        return {}
+
+    changes = {y.year: y.achange for y in years}
+    index: dict[int, decimal.Decimal] = {}
+    level = decimal.Decimal(1)
+    # Kept exact, so that ratios between any two years are exact as well
+    with decimal.localcontext(prec=decimal.MAX_PREC):
+        for year in range(min(changes), max(changes) + 2):
+            index[year] = level
+            if year in changes:
+                level *= changes[year] + 1
+
+    return index
+
+
+@instrument.timed("inflation.load_inflation")
 def load_inflation(
     fname: str = "data/aus_inflation.json",
     measure: InflationMeasure = InflationMeasure.CPI,
+    use_cache: bool = True,
 ) -> Inflation:
+    if use_cache:
+        return registry.default.load(fname, "inflation", _load_all_measures)[measure]
+
     with open(fname, "r") as fh:
         return _load_inflation_from_content(json.load(fh), measure)
 
 
+def _load_all_measures(content: list[typing.Any]) -> dict[InflationMeasure, Inflation]:
+    return {m: _load_inflation_from_content(content, m) for m in InflationMeasure}
+
+
 def _load_inflation_from_content(
     content: list[typing.Any], measure: InflationMeasure
 ) -> Inflation:
@@ -56,10 +117,11 @@ def _load_inflation_from_content(
     years = [
         InflationYear(
             year=parse.parse_financial_year(r["year"]),
-            achange=decimal.Decimal(r[key]),
+            achange=parse.parse_decimal(r[key]),
         )
         for r in content
     ]
 
     years.sort(key=lambda i: i.year, reverse=True)
+    instrument.count("inflation.years_parsed", len(years))
     return Inflation(years=years)
@@ -1,25 +1,43 @@
-import matplotlib.pyplot as plt
-import pandas as pd
-from analysis import inflation, labels
+import typing
+from analysis import inflation, instrument, labels
+
+if typing.TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 
 def _show_inflation_rates() -> None:
     cpi_inflation = inflation.load_inflation(measure=inflation.InflationMeasure.CPI)
     wpi_inflation = inflation.load_inflation(measure=inflation.InflationMeasure.WPI)
 
-    fy_index = [labels.financial_year(i.year) for i in reversed(cpi_inflation.years)]
+    import matplotlib.pyplot as plt
+
+    _plot_inflation_rates(plt.figure(), cpi_inflation, wpi_inflation)
+    plt.show()
+
+
+@instrument.timed("render.inflation_over_time")
+def _plot_inflation_rates(
+    fig: "Figure",
+    cpi_inflation: inflation.Inflation,
+    wpi_inflation: inflation.Inflation,
+) -> None:
+    import pandas as pd
+
+    cpi = cpi_inflation.to_dataframe().iloc[::-1]
+    wpi = wpi_inflation.to_dataframe().iloc[::-1]
+    fy_index = cpi["fy"].tolist()
     df = pd.DataFrame(
         {
-            "CPI": [float(i.achange * 100) for i in reversed(cpi_inflation.years)],
-            "WPI": [float(i.achange * 100) for i in reversed(wpi_inflation.years)],
+            "CPI": cpi["achange"].to_numpy() * 100,
+            "WPI": wpi["achange"].to_numpy() * 100,
         },
         index=fy_index,
     )
     x_to_fy = labels.create_x_to_fy(fy_index)
 
-    df.plot()
-    plt.gca().format_coord = lambda x, y: f"y={x_to_fy(x)}, {y:.1f}%"  # type: ignore[method-assign]
-    plt.show()
+    ax = fig.subplots()
+    df.plot(ax=ax)
+    ax.format_coord = lambda x, y: f"y={x_to_fy(x)}, {y:.1f}%"  # type: ignore[method-assign]
 
 
 if __name__ == "__main__":
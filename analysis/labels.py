@@ -1,5 +1,9 @@
 import typing
 
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
 
 _clamp: typing.Callable[[int, int, int], int] = lambda x, y, z: max(x, min(y, z))
 
@@ -11,6 +15,19 @@ def financial_year(year: int) -> str:
         return f"{year}-{year % 100 + 1:02}"
 
 
+def financial_years(
+    years: "npt.NDArray[np.integer[typing.Any]]",
+) -> "npt.NDArray[np.str_]":
+    # The label of every year, as financial_year gives it, built with array string
+    # operations rather than one format per year
+    import numpy as np
+
+    result = np.char.add(
+        np.char.mod("%d-", years), np.char.mod("%02d", years % 100 + 1)
+    )
+    return np.where(years == 1999, "1999-2000", result)
+
+
 def create_x_to_fy(years: list[str]) -> typing.Callable[[float], str]:
     assert len(years) > 0
 
@@ -0,0 +1,96 @@
+import concurrent.futures
+import numpy as np
+import numpy.typing as npt
+import os
+import time
+import typing
+from multiprocessing import shared_memory
+from analysis import tax
+
+
+# Set in each worker process by _init_worker
+_tables: list[tax.TaxTable] = []
+_incomes: typing.Optional[npt.NDArray[np.int64]] = None
+_result: typing.Optional[npt.NDArray[np.float64]] = None
+_buffers: list[shared_memory.SharedMemory] = []
+
+
+def income_grid(start: int, stop: int, step: int = 1) -> npt.NDArray[np.int64]:
+    return np.arange(start, stop, step, dtype=np.int64)
+
+
+def evaluate(
+    tax_tables: tax.MultiYearTaxTable,
+    incomes: npt.NDArray[np.integer[typing.Any]],
+    workers: typing.Optional[int] = None,
+    chunk_size: int = 250_000,
+) -> npt.NDArray[np.float64]:
+    # Returns the tax on every income for every table, with one row per entry in
+    # year_tables. Work is split into (table, chunk of incomes) units, and workers
+    # read incomes from & write tax into shared memory, so only the unit bounds are
+    # sent between processes.
+    assert incomes.ndim == 1
+    assert chunk_size > 0
+    tables = tax_tables.year_tables
+    workers = workers if workers is not None else os.cpu_count() or 1
+    units = [
+        (i, lo, min(lo + chunk_size, len(incomes)))
+        for i in range(len(tables))
+        for lo in range(0, len(incomes), chunk_size)
+    ]
+
+    if workers == 1 or len(units) <= 1:
+        return np.stack([t.calculate_tax_many(incomes) for t in tables])
+
+    shape = (len(tables), len(incomes))
+    in_buffer = shared_memory.SharedMemory(create=True, size=max(1, incomes.size * 8))
+    out_buffer = shared_memory.SharedMemory(
+        create=True, size=max(1, shape[0] * shape[1] * 8)
+    )
+    try:
+        np.ndarray(incomes.shape, dtype=np.int64, buffer=in_buffer.buf)[:] = incomes
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(tables, in_buffer.name, out_buffer.name, shape),
+        ) as executor:
+            for _ in executor.map(_evaluate_unit, units):
+                pass
+
+        return np.ndarray(shape, dtype=np.float64, buffer=out_buffer.buf).copy()
+    finally:
+        for buffer in (in_buffer, out_buffer):
+            buffer.close()
+            buffer.unlink()
+
+
+def _init_worker(
+    tables: list[tax.TaxTable],
+    in_name: str,
+    out_name: str,
+    shape: tuple[int, int],
+) -> None:
+    global _tables, _incomes, _result, _buffers
+    in_buffer = shared_memory.SharedMemory(name=in_name)
+    out_buffer = shared_memory.SharedMemory(name=out_name)
+    _tables = tables
+    _incomes = np.ndarray((shape[1],), dtype=np.int64, buffer=in_buffer.buf)
+    _result = np.ndarray(shape, dtype=np.float64, buffer=out_buffer.buf)
+    # Keep the mappings open for as long as the worker lives
+    _buffers = [in_buffer, out_buffer]
+
+
+def _evaluate_unit(unit: tuple[int, int, int]) -> None:
+    assert _incomes is not None and _result is not None
+    i, lo, hi = unit
+    _result[i, lo:hi] = _tables[i].calculate_tax_many(_incomes[lo:hi])
+
+
+if __name__ == "__main__":
+    tax_tables = tax.load_tax_tables()
+    grid = income_grid(0, 1_000_001)
+    for workers in sorted({1, os.cpu_count() or 1}):
+        started = time.perf_counter()
+        evaluate(tax_tables, grid, workers=workers)
+        elapsed = time.perf_counter() - started
+        print(f"{workers} workers: {elapsed:.2f}s")
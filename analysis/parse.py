@@ -1,3 +1,5 @@
+import decimal
+import functools
 import re
 
 
@@ -11,3 +13,10 @@ def parse_financial_year(fy: str) -> int:
     assert 2000 + int(match.group(2)) - year == 1, f"Invalid financial year: {fy}"
 
     return year
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_decimal(value: str) -> decimal.Decimal:
+    # Decimals are immutable, so every bracket with the same rate or boundary can
+    # share one instance. Keyed by the text, so "0.30" & "0.3" stay distinct.
+    return decimal.Decimal(value)
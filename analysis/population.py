@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+import csv
+import numpy as np
+import numpy.typing as npt
+import typing
+from analysis import labels, tax
+
+
+# Incomes (whole dollars) and the number of taxpayers each row stands for
+Chunk = tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]
+# Sources are called once per pass, and must yield the same chunks every time
+Source = typing.Callable[[], typing.Iterator[Chunk]]
+
+_DECILES = 10
+
+
+@dataclass(frozen=True)
+class DecileSummary:
+    # Incomes in the decile are >= lower and < upper
+    lower: float
+    upper: float
+    taxpayers: float
+    total_income: float
+    revenue: float
+    average_rate: float
+
+
+@dataclass(frozen=True)
+class YearSummary:
+    year: int
+    taxpayers: float
+    total_income: float
+    revenue: float
+    average_rate: float
+    average_marginal_rate: float
+    deciles: list[DecileSummary]
+
+
+def synthetic_incomes(
+    size: int,
+    median: float = 60_000,
+    sigma: float = 0.7,
+    seed: int = 0,
+    chunk_size: int = 1_000_000,
+) -> Source:
+    # Log-normal incomes, regenerated from the same seed on every pass
+    def chunks() -> typing.Iterator[Chunk]:
+        rng = np.random.default_rng(seed)
+        for offset in range(0, size, chunk_size):
+            n = min(chunk_size, size - offset)
+            incomes = rng.lognormal(mean=np.log(median), sigma=sigma, size=n)
+            yield incomes.astype(np.int64), np.ones(n)
+
+    return chunks
+
+
+def file_incomes(fname: str, chunk_size: int = 1_000_000) -> Source:
+    # A .npy file holds either incomes, or rows of [income, weight]. Anything else is
+    # read as a CSV with an income column and an optional weight column.
+    if fname.endswith(".npy"):
+        return lambda: _npy_chunks(fname, chunk_size)
+    return lambda: _csv_chunks(fname, chunk_size)
+
+
+def _npy_chunks(fname: str, chunk_size: int) -> typing.Iterator[Chunk]:
+    data = np.load(fname, mmap_mode="r")
+    assert data.ndim in (1, 2)
+    for offset in range(0, data.shape[0], chunk_size):
+        rows = np.asarray(data[offset : offset + chunk_size])
+        if rows.ndim == 1:
+            yield rows.astype(np.int64), np.ones(rows.shape[0])
+        else:
+            yield rows[:, 0].astype(np.int64), rows[:, 1].astype(np.float64)
+
+
+def _csv_chunks(fname: str, chunk_size: int) -> typing.Iterator[Chunk]:
+    with open(fname, "r", newline="") as fh:
+        reader = csv.DictReader(fh)
+        assert reader.fieldnames is not None and "income" in reader.fieldnames
+        weighted = "weight" in reader.fieldnames
+        incomes: list[int] = []
+        weights: list[float] = []
+        for row in reader:
+            incomes.append(int(row["income"]))
+            weights.append(float(row["weight"]) if weighted else 1.0)
+            if len(incomes) == chunk_size:
+                yield np.array(incomes, dtype=np.int64), np.array(weights)
+                incomes.clear()
+                weights.clear()
+        if len(incomes) > 0:
+            yield np.array(incomes, dtype=np.int64), np.array(weights)
+
+
+def simulate(
+    tax_tables: tax.MultiYearTaxTable,
+    source: Source,
+    bin_width: int = 100,
+    max_income: int = 10_000_000,
+) -> list[YearSummary]:
+    # Two passes over the source, so memory is bounded by the chunk size. The first
+    # finds the decile boundaries from a histogram of bin_width dollar bins, the
+    # second computes tax for every year one chunk at a time.
+    edges = _decile_edges(source, bin_width=bin_width, max_income=max_income)
+    tables = tax_tables.year_tables
+    taxpayers = np.zeros((len(tables), _DECILES))
+    income = np.zeros((len(tables), _DECILES))
+    revenue = np.zeros((len(tables), _DECILES))
+    marginal = np.zeros(len(tables))
+
+    for incomes, weights in source():
+        deciles = np.searchsorted(edges, incomes, side="right")
+        chunk_taxpayers = np.bincount(deciles, weights=weights, minlength=_DECILES)
+        chunk_income = np.bincount(
+            deciles, weights=weights * incomes, minlength=_DECILES
+        )
+        for i, table in enumerate(tables):
+            tax_amount = table.calculate_tax_many(incomes)
+            taxpayers[i] += chunk_taxpayers
+            income[i] += chunk_income
+            revenue[i] += np.bincount(
+                deciles, weights=weights * tax_amount, minlength=_DECILES
+            )
+            marginal[i] += np.dot(weights, table.marginal_rate_many(incomes))
+
+    bounds = [0.0] + [float(e) for e in edges] + [float("inf")]
+    return [
+        YearSummary(
+            year=table.year,
+            taxpayers=float(taxpayers[i].sum()),
+            total_income=float(income[i].sum()),
+            revenue=float(revenue[i].sum()),
+            average_rate=_rate(revenue[i].sum(), income[i].sum()),
+            average_marginal_rate=_rate(marginal[i], taxpayers[i].sum()),
+            deciles=[
+                DecileSummary(
+                    lower=bounds[d],
+                    upper=bounds[d + 1],
+                    taxpayers=float(taxpayers[i, d]),
+                    total_income=float(income[i, d]),
+                    revenue=float(revenue[i, d]),
+                    average_rate=_rate(revenue[i, d], income[i, d]),
+                )
+                for d in range(_DECILES)
+            ],
+        )
+        for i, table in enumerate(tables)
+    ]
+
+
+def _decile_edges(
+    source: Source, bin_width: int, max_income: int
+) -> npt.NDArray[np.int64]:
+    bins = max_income // bin_width + 1
+    histogram = np.zeros(bins)
+    for incomes, weights in source():
+        index = np.clip(incomes // bin_width, 0, bins - 1)
+        histogram += np.bincount(index, weights=weights, minlength=bins)
+
+    cumulative = np.cumsum(histogram)
+    assert cumulative[-1] > 0, "Empty income distribution"
+    quantiles = cumulative[-1] * np.arange(1, _DECILES) / _DECILES
+    upper_bins = np.searchsorted(cumulative, quantiles, side="left")
+    edges: npt.NDArray[np.int64] = (upper_bins + 1) * bin_width
+    return edges
+
+
+def _rate(numerator: float, denominator: float) -> float:
+    return float(numerator / denominator) if denominator != 0 else 0.0
+
+
+if __name__ == "__main__":
+    summaries = simulate(tax.load_tax_tables(), synthetic_incomes(size=10_000_000))
+    for s in reversed(summaries):
+        print(
+            f"{labels.financial_year(s.year)}: revenue ${s.revenue / 1e9:,.1f}bn, "
+            f"average rate {s.average_rate * 100:.1f}%, "
+            f"average marginal rate {s.average_marginal_rate * 100:.1f}%"
+        )
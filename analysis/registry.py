@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+import json
+import os
+import threading
+import typing
+from analysis import cache
+
+
+T = typing.TypeVar("T")
+
+
+@dataclass(frozen=True)
+class _Entry:
+    signature: tuple[int, int]
+    value: typing.Any
+
+
+class Registry:
+    # Keeps each compiled dataset in memory, keyed by path and the name of what it
+    # was compiled into. With watch enabled, every lookup re-stats the source and
+    # reloads it once it changes.
+
+    def __init__(self, watch: bool = False) -> None:
+        self.watch = watch
+        self._entries: dict[tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+        self._on_invalidate: list[typing.Callable[[], None]] = []
+
+    def load(
+        self,
+        fname: str,
+        name: str,
+        compile: typing.Callable[[typing.Any], T],
+        parse: typing.Callable[[bytes], typing.Any] = json.loads,
+        watch: typing.Optional[bool] = None,
+    ) -> T:
+        # watch overrides the registry's own, for values only valid for the current
+        # source
+        key = (os.path.abspath(fname), name)
+        entry = self._entries.get(key)
+        if entry is not None and (
+            not (self.watch if watch is None else watch)
+            or entry.signature == _signature(fname)
+        ):
+            return typing.cast(T, entry.value)
+
+        with self._lock:
+            signature = _signature(fname)
+            entry = self._entries.get(key)
+            if entry is None or entry.signature != signature:
+                entry = _Entry(
+                    signature=signature,
+                    value=cache.load_compiled(fname, name, compile, parse=parse),
+                )
+                self._entries[key] = entry
+
+        return typing.cast(T, entry.value)
+
+    def on_invalidate(self, callback: typing.Callable[[], None]) -> None:
+        # For caches of values derived from the datasets, which would otherwise keep
+        # invalidated ones alive
+        self._on_invalidate.append(callback)
+
+    def invalidate(self, fname: typing.Optional[str] = None) -> None:
+        with self._lock:
+            if fname is None:
+                self._entries.clear()
+            else:
+                path = os.path.abspath(fname)
+                for key in [k for k in self._entries if k[0] == path]:
+                    del self._entries[key]
+
+        for callback in self._on_invalidate:
+            callback()
+
+
+def _signature(fname: str) -> tuple[int, int]:
+    stat = os.stat(fname)
+    return stat.st_mtime_ns, stat.st_size
+
+
+default = Registry()
+
+
+def invalidate(fname: typing.Optional[str] = None) -> None:
+    default.invalidate(fname)
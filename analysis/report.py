@@ -0,0 +1,265 @@
+import matplotlib
+
+# Headless, so this works without a display
+matplotlib.use("Agg")
+
+import argparse
+import concurrent.futures
+from dataclasses import dataclass
+from matplotlib.figure import Figure
+import os
+import sys
+import time
+import typing
+from analysis import (
+    effective_tax_over_time,
+    incremental,
+    inflation,
+    inflation_over_time,
+    instrument,
+    tax,
+    tax_rates_over_time,
+)
+
+
+DEFAULT_INCOMES = [20_000, 50_000, 100_000, 200_000]
+DEFAULT_FORMATS = ["png", "svg"]
+_MEASURES: list[typing.Optional[inflation.InflationMeasure]] = [
+    None,
+    *inflation.InflationMeasure,
+]
+
+
+@dataclass(frozen=True)
+class Chart:
+    # Used as the file name, without the extension
+    name: str
+    entry_point: str
+    measure: typing.Optional[inflation.InflationMeasure] = None
+    income: typing.Optional[int] = None
+
+
+@dataclass(frozen=True)
+class _Data:
+    # Nominal under None, and adjusted for each inflation measure
+    tax_tables: dict[typing.Optional[inflation.InflationMeasure], tax.MultiYearTaxTable]
+    inflations: dict[inflation.InflationMeasure, inflation.Inflation]
+    # By measure & income, for each effective_tax_over_time chart
+    effective_rates: dict[
+        tuple[typing.Optional[inflation.InflationMeasure], int],
+        list[incremental.EffectiveRate],
+    ]
+
+    def tax_tables_for(
+        self, measure: typing.Optional[inflation.InflationMeasure]
+    ) -> tax.MultiYearTaxTable:
+        return self.tax_tables[measure]
+
+
+# Set in each worker process by _init_worker
+_data: typing.Optional[_Data] = None
+_figure: typing.Optional[Figure] = None
+
+
+def charts(incomes: typing.Iterable[int] = DEFAULT_INCOMES) -> list[Chart]:
+    return [
+        *[
+            Chart(
+                name=f"tax_rates_over_time_{_measure_name(m)}",
+                entry_point="tax_rates_over_time",
+                measure=m,
+            )
+            for m in _MEASURES
+        ],
+        Chart(name="inflation_over_time", entry_point="inflation_over_time"),
+        *[
+            Chart(
+                name=f"effective_tax_over_time_{i}_{_measure_name(m)}",
+                entry_point="effective_tax_over_time",
+                measure=m,
+                income=i,
+            )
+            for i in incomes
+            for m in _MEASURES
+        ],
+    ]
+
+
+def _measure_name(measure: typing.Optional[inflation.InflationMeasure]) -> str:
+    return measure.value.lower() if measure is not None else "nominal"
+
+
+def render(
+    out_dir: str,
+    to_render: typing.Sequence[Chart],
+    formats: typing.Sequence[str] = DEFAULT_FORMATS,
+    workers: typing.Optional[int] = None,
+    store: typing.Optional[incremental.Store] = None,
+    tax_fname: str = "data/aus_tax_table.json",
+    inflation_fname: str = "data/aus_inflation.json",
+) -> list[str]:
+    # The data is loaded once here and handed to each worker, and each worker draws
+    # every chart it is given onto the same figure. With a store, a chart is only
+    # drawn again once the data it's drawn from changes, or its files go missing.
+    # Returns the files of every chart, drawn or not.
+    os.makedirs(out_dir, exist_ok=True)
+    pipeline = incremental.Pipeline(store if store is not None else incremental.Store())
+    tax_tables = tax.load_tax_tables(tax_fname)
+    inflations = {
+        m: inflation.load_inflation(inflation_fname, measure=m)
+        for m in inflation.InflationMeasure
+    }
+    year_tables = {
+        m: pipeline.year_tables(tax_tables, inflations, m) for m in _MEASURES
+    }
+    effective_rates = {
+        (c.measure, c.income): pipeline.effective_rates(
+            year_tables[c.measure], c.income, c.measure
+        )
+        for c in to_render
+        if c.entry_point == "effective_tax_over_time" and c.income is not None
+    }
+    data = _Data(
+        tax_tables={m: incremental.combine(t).value for m, t in year_tables.items()},
+        inflations=inflations,
+        effective_rates={k: n.value for k, n in effective_rates.items()},
+    )
+
+    files: dict[str, list[str]] = {}
+    jobs: list[tuple[Chart, str, tuple[str, ...]]] = []
+    fingerprints: dict[str, tuple[incremental.Key, str]] = {}
+    for chart in to_render:
+        key = ("chart", chart.name, os.path.abspath(out_dir), tuple(formats))
+        current = incremental.fingerprint(
+            key, _chart_inputs(chart, year_tables, inflations, effective_rates)
+        )
+        stored = pipeline.store.get(key, current)
+        if stored is not None and all(os.path.exists(f) for f in stored):
+            files[chart.name] = stored
+        else:
+            jobs.append((chart, out_dir, tuple(formats)))
+            fingerprints[chart.name] = (key, current)
+
+    workers = workers if workers is not None else os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker(data)
+        written = [_render_chart(job) for job in jobs]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(data,)
+        ) as executor:
+            written = list(executor.map(_render_chart, jobs))
+
+    for (chart, _, _), chart_files in zip(jobs, written):
+        key, current = fingerprints[chart.name]
+        pipeline.store.put(key, current, chart_files)
+        files[chart.name] = chart_files
+
+    return [f for chart in to_render for f in files[chart.name]]
+
+
+def _chart_inputs(
+    chart: Chart,
+    year_tables: dict[
+        typing.Optional[inflation.InflationMeasure],
+        list[incremental.Node[tax.TaxTable]],
+    ],
+    inflations: dict[inflation.InflationMeasure, inflation.Inflation],
+    effective_rates: dict[
+        tuple[typing.Optional[inflation.InflationMeasure], int],
+        incremental.Node[list[incremental.EffectiveRate]],
+    ],
+) -> str:
+    # The fingerprint of the data that the chart is drawn from
+    if chart.entry_point == "tax_rates_over_time":
+        return incremental.combine(year_tables[chart.measure]).fingerprint
+    elif chart.entry_point == "inflation_over_time":
+        return incremental.fingerprint(
+            inflations[inflation.InflationMeasure.CPI].years,
+            inflations[inflation.InflationMeasure.WPI].years,
+        )
+    elif chart.entry_point == "effective_tax_over_time":
+        assert chart.income is not None
+        return effective_rates[(chart.measure, chart.income)].fingerprint
+    else:
+        assert False, f"Unknown entry point: {chart.entry_point}"
+
+
+def _init_worker(data: _Data) -> None:
+    global _data, _figure
+    _data = data
+    _figure = Figure()
+
+
+def _render_chart(job: tuple[Chart, str, tuple[str, ...]]) -> list[str]:
+    assert _data is not None and _figure is not None
+    chart, out_dir, formats = job
+    fig = _figure
+    fig.clear()
+    fig.set_size_inches(matplotlib.rcParams["figure.figsize"])
+
+    if chart.entry_point == "tax_rates_over_time":
+        tax_rates_over_time._plot_tax_tables(fig, _data.tax_tables_for(chart.measure))
+    elif chart.entry_point == "inflation_over_time":
+        inflation_over_time._plot_inflation_rates(
+            fig,
+            _data.inflations[inflation.InflationMeasure.CPI],
+            _data.inflations[inflation.InflationMeasure.WPI],
+        )
+    elif chart.entry_point == "effective_tax_over_time":
+        assert chart.income is not None
+        rates = _data.effective_rates[(chart.measure, chart.income)]
+        effective_tax_over_time._plot_effective_rates(
+            fig, rates, [chart.income] * len(rates)
+        )
+    else:
+        assert False, f"Unknown entry point: {chart.entry_point}"
+
+    written = []
+    for fmt in formats:
+        fname = os.path.join(out_dir, f"{chart.name}.{fmt}")
+        with instrument.timer(f"render.savefig.{fmt}"):
+            fig.savefig(fname, format=fmt)
+        written.append(fname)
+
+    return written
+
+
+def _main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m analysis.report")
+    parser.add_argument("--out-dir", default="report")
+    parser.add_argument(
+        "--format", action="append", help=f"default: {', '.join(DEFAULT_FORMATS)}"
+    )
+    parser.add_argument(
+        "--income",
+        action="append",
+        type=int,
+        help=f"default: {', '.join(str(i) for i in DEFAULT_INCOMES)}",
+    )
+    parser.add_argument("--workers", type=int)
+    parser.add_argument(
+        "--store", help="reuse results from, and save them to, this file"
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    store = incremental.Store(args.store) if args.store is not None else None
+    written = render(
+        args.out_dir,
+        charts(args.income or DEFAULT_INCOMES),
+        formats=args.format or DEFAULT_FORMATS,
+        workers=args.workers,
+        store=store,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"{len(written)} files in {args.out_dir}, after {elapsed:.1f}s")
+    if store is not None:
+        store.save()
+        print(f"Reused {store.hits} of {store.hits + store.misses} results")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,106 @@
+import bisect
+import dataclasses
+import decimal
+import typing
+from analysis import labels, tax
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
+
+# Bounds the (scenarios, incomes) temporaries of each pass in calculate_tax_many
+_CHUNK_ELEMENTS = 1 << 20
+
+# Derived tables share every bracket they don't change with the table they're
+# derived from. Brackets are immutable, so only the list of them is copied, and a
+# derived table is checked against the same invariants as a loaded one.
+
+
+def with_rate(table: tax.TaxTable, index: int, rate: decimal.Decimal) -> tax.TaxTable:
+    brackets = list(table.brackets)
+    brackets[index] = dataclasses.replace(brackets[index], rate=rate)
+    return _derive(table, brackets)
+
+
+def with_threshold(
+    table: tax.TaxTable, index: int, start: decimal.Decimal
+) -> tax.TaxTable:
+    # Moves where a bracket starts, and where the one below it ends
+    assert 0 < index < len(table.brackets), f"No threshold to move at {index}"
+    brackets = list(table.brackets)
+    brackets[index - 1] = dataclasses.replace(brackets[index - 1], end=start - 1)
+    brackets[index] = dataclasses.replace(brackets[index], start=start)
+    return _derive(table, brackets)
+
+
+def with_bracket(
+    table: tax.TaxTable, start: decimal.Decimal, rate: decimal.Decimal
+) -> tax.TaxTable:
+    # Splits the bracket that start falls in, and taxes from start up at rate
+    i = bisect.bisect_right([b.start for b in table.brackets], start) - 1
+    assert i >= 0, f"Bracket starts below zero: {start}"
+    split = table.brackets[i]
+    assert split.start < start, f"A bracket already starts at {start}"
+    brackets = list(table.brackets)
+    brackets[i : i + 1] = [
+        dataclasses.replace(split, end=start - 1),
+        tax.TaxBracket(start=start, end=split.end, rate=rate),
+    ]
+    return _derive(table, brackets)
+
+
+def without_bracket(table: tax.TaxTable, index: int) -> tax.TaxTable:
+    # The bracket below takes over the removed one's incomes, or the one above if
+    # it's the first
+    assert 0 <= index < len(table.brackets) and len(table.brackets) > 1
+    brackets = list(table.brackets)
+    removed = brackets.pop(index)
+    if index > 0:
+        brackets[index - 1] = dataclasses.replace(brackets[index - 1], end=removed.end)
+    else:
+        brackets[0] = dataclasses.replace(brackets[0], start=removed.start)
+    return _derive(table, brackets)
+
+
+def _derive(table: tax.TaxTable, brackets: list[tax.TaxBracket]) -> tax.TaxTable:
+    fy = labels.financial_year(table.year)
+    for bracket in brackets:
+        tax._validate_bracket(bracket, fy=fy)
+    tax._validate_brackets(brackets, fy=fy)
+    return tax.TaxTable(year=table.year, brackets=brackets)
+
+
+def calculate_tax_many(
+    tables: typing.Sequence[tax.TaxTable],
+    taxable_incomes: "npt.NDArray[np.integer[typing.Any]]",
+) -> "npt.NDArray[np.float64]":
+    # The tax on every income under every table, as (tables, incomes). Between two
+    # consecutive breakpoints of any table's tax curve, every table stays on one
+    # segment. So each income is located once among all the breakpoints, and each
+    # table's slope & intercept on that interval are looked up from a small grid.
+    import numpy as np
+
+    assert np.issubdtype(taxable_incomes.dtype, np.integer)
+    curves = [t.tax_curve() for t in tables]
+    breakpoints = [np.array([float(b) for b in c.breakpoints]) for c in curves]
+    # Includes -infinity, which every curve starts at
+    edges = np.unique(np.concatenate([np.array([-np.inf]), *breakpoints]))
+    slopes = np.empty((len(curves), len(edges)))
+    intercepts = np.empty((len(curves), len(edges)))
+    for i, curve in enumerate(curves):
+        segment = np.searchsorted(breakpoints[i], edges, side="right") - 1
+        slopes[i] = np.array([float(s) for s in curve.slopes])[segment]
+        intercepts[i] = np.array([float(c) for c in curve.intercepts])[segment]
+
+    incomes = taxable_incomes.astype(np.float64)
+    interval = np.searchsorted(edges, incomes, side="right") - 1
+    result = np.empty((len(curves), len(incomes)))
+    chunk_size = max(1, _CHUNK_ELEMENTS // max(1, len(curves)))
+    for lo in range(0, len(incomes), chunk_size):
+        hi = lo + chunk_size
+        out = result[:, lo:hi]
+        np.multiply(slopes[:, interval[lo:hi]], incomes[lo:hi], out=out)
+        out += intercepts[:, interval[lo:hi]]
+
+    return result
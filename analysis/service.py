@@ -0,0 +1,341 @@
+import argparse
+import asyncio
+import collections
+import decimal
+import json
+import math
+import numpy as np
+import numpy.typing as npt
+import sys
+import time
+import typing
+import urllib.parse
+from analysis import inflation, labels, tax
+
+
+# Latencies kept per endpoint for the percentiles in /stats
+_LATENCY_WINDOW = 10_000
+# Within this, tax is exact in int64 fixed point units for rates of up to
+# fixed_point.MAX_RATE_DIGITS places
+_MAX_INCOME = 10**12
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+Query = dict[str, list[str]]
+# A pending request for the tax on some incomes, and where to put the result
+_Pending = tuple[npt.NDArray[np.int64], "asyncio.Future[npt.NDArray[np.float64]]"]
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Service:
+    # Answers tax & inflation queries from data kept in memory. Tax requests that
+    # arrive together, for the same table, are evaluated with one call to
+    # calculate_tax_many. A batch is flushed once the event loop has handled every
+    # request that was ready, or after batch_delay seconds if that's set.
+
+    def __init__(
+        self,
+        tax_tables: tax.MultiYearTaxTable,
+        inflations: dict[inflation.InflationMeasure, inflation.Inflation],
+        batch_delay: float = 0.0,
+    ) -> None:
+        self.tax_tables = tax_tables
+        self.inflations = inflations
+        # Adjusted once, rather than looking up every year's view on each request
+        self._tables: dict[
+            typing.Optional[inflation.InflationMeasure], tax.MultiYearTaxTable
+        ] = {
+            None: tax_tables,
+            **{m: tax_tables.adjusted_for_inflation(i) for m, i in inflations.items()},
+        }
+        self.batch_delay = batch_delay
+        self.batches = 0
+        self.batched_requests = 0
+        self._pending: dict[
+            tuple[typing.Optional[inflation.InflationMeasure], int], list[_Pending]
+        ] = {}
+        self._latencies: dict[str, collections.deque[float]] = {}
+        self._routes: dict[
+            str, typing.Callable[[Query], typing.Awaitable[typing.Any]]
+        ] = {
+            "/tax": self._tax_endpoint,
+            "/inflation/adjust": self._adjust_endpoint,
+            "/effective-rates": self._effective_rates_endpoint,
+            "/stats": self._stats_endpoint,
+        }
+
+    def tables_for(
+        self, measure: typing.Optional[inflation.InflationMeasure]
+    ) -> tax.MultiYearTaxTable:
+        return self._tables[measure]
+
+    async def calculate_tax(
+        self,
+        year: int,
+        incomes: npt.NDArray[np.int64],
+        measure: typing.Optional[inflation.InflationMeasure] = None,
+    ) -> npt.NDArray[np.float64]:
+        # Checked here, so that a bad request can't fail the rest of its batch
+        table = self.tables_for(measure).table_for(year)
+        key = (measure, year)
+        future: asyncio.Future[npt.NDArray[np.float64]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = []
+            loop = asyncio.get_running_loop()
+            if self.batch_delay > 0:
+                loop.call_later(self.batch_delay, self._flush, key, table)
+            else:
+                loop.call_soon(self._flush, key, table)
+        pending.append((incomes, future))
+
+        return await future
+
+    def _flush(
+        self,
+        key: tuple[typing.Optional[inflation.InflationMeasure], int],
+        table: tax.TaxTable,
+    ) -> None:
+        pending = self._pending.pop(key)
+        self.batches += 1
+        self.batched_requests += len(pending)
+        try:
+            result = table.calculate_tax_many(np.concatenate([p[0] for p in pending]))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for incomes, future in pending:
+            if not future.done():
+                future.set_result(result[offset : offset + len(incomes)])
+            offset += len(incomes)
+
+    def adjust(
+        self,
+        amount: decimal.Decimal,
+        from_year: int,
+        to_year: int,
+        measure: inflation.InflationMeasure = inflation.InflationMeasure.CPI,
+    ) -> decimal.Decimal:
+        return self.inflations[measure].adjust(
+            amount=amount, from_year=from_year, to_year=to_year
+        )
+
+    async def effective_rates(
+        self, income: int, measure: typing.Optional[inflation.InflationMeasure] = None
+    ) -> list[dict[str, typing.Any]]:
+        tables = self.tables_for(measure)
+        years = sorted(t.year for t in tables.year_tables)
+        incomes = np.array([income], dtype=np.int64)
+        taxes = await asyncio.gather(
+            *[self.calculate_tax(y, incomes, measure) for y in years]
+        )
+        return [
+            {
+                "year": year,
+                "fy": labels.financial_year(year),
+                "tax": float(t[0]),
+                "rate": float(t[0]) / income if income > 0 else 0.0,
+            }
+            for year, t in zip(years, taxes)
+        ]
+
+    def stats(self) -> dict[str, typing.Any]:
+        return {
+            "endpoints": {
+                path: {
+                    "count": len(latencies),
+                    "p50_ms": _percentile(latencies, 0.50) * 1000,
+                    "p99_ms": _percentile(latencies, 0.99) * 1000,
+                }
+                for path, latencies in self._latencies.items()
+            },
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+        }
+
+    async def handle(self, method: str, target: str) -> tuple[int, typing.Any]:
+        started = time.perf_counter()
+        url = urllib.parse.urlsplit(target)
+        route = self._routes.get(url.path)
+        if route is None:
+            return 404, {"error": f"Unknown path: {url.path}"}
+        if method != "GET":
+            return 405, {"error": f"Unsupported method: {method}"}
+
+        try:
+            status, body = 200, await route(urllib.parse.parse_qs(url.query))
+        # ArithmeticError covers every decimal error, eg. from an amount too large
+        except (BadRequest, AssertionError, ValueError, ArithmeticError) as e:
+            # Decimal errors only stringify as a list of their signals
+            message = "" if isinstance(e, decimal.DecimalException) else str(e)
+            status, body = 400, {"error": message or type(e).__name__}
+
+        latencies = self._latencies.get(url.path)
+        if latencies is None:
+            latencies = self._latencies[url.path] = collections.deque(
+                maxlen=_LATENCY_WINDOW
+            )
+        latencies.append(time.perf_counter() - started)
+        return status, body
+
+    async def _tax_endpoint(self, query: Query) -> typing.Any:
+        year = int(_one(query, "year"))
+        incomes = np.array(
+            [_income(i) for i in query.get("income", [])], dtype=np.int64
+        )
+        measure = _measure(query)
+        result = await self.calculate_tax(year, incomes, measure)
+        return {"year": year, "tax": result.tolist()}
+
+    async def _adjust_endpoint(self, query: Query) -> typing.Any:
+        result = self.adjust(
+            decimal.Decimal(_one(query, "amount")),
+            from_year=int(_one(query, "from")),
+            to_year=int(_one(query, "to")),
+            measure=_measure(query) or inflation.InflationMeasure.CPI,
+        )
+        return {"amount": str(result)}
+
+    async def _effective_rates_endpoint(self, query: Query) -> typing.Any:
+        return await self.effective_rates(
+            _income(_one(query, "income")), _measure(query)
+        )
+
+    async def _stats_endpoint(self, query: Query) -> typing.Any:
+        return self.stats()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # HTTP/1.1 GETs, with keep alive. Headers past the reader's 64KiB limit end
+        # the connection.
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {
+                    k.strip().lower(): v.strip()
+                    for k, _, v in (h.partition(":") for h in header_lines if h)
+                }
+                parts = request_line.split(" ")
+                if len(parts) != 3:
+                    status, body = 400, {"error": "Malformed request line"}
+                else:
+                    try:
+                        status, body = await self.handle(parts[0], parts[1])
+                    except Exception:
+                        # A bug, rather than a bad request, but the client still
+                        # gets a response and the connection stays usable
+                        status, body = 500, {"error": "Internal error"}
+
+                content = json.dumps(body).encode()
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(content)}\r\n"
+                        f"Connection: {'close' if close else 'keep-alive'}\r\n"
+                        "\r\n"
+                    ).encode()
+                    + content
+                )
+                await writer.drain()
+                if close:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def _one(query: Query, name: str) -> str:
+    values = query.get(name, [])
+    if len(values) != 1:
+        raise BadRequest(f"Expected one {name}")
+    return values[0]
+
+
+def _income(value: str) -> int:
+    income = int(value)
+    if abs(income) > _MAX_INCOME:
+        raise BadRequest(f"Income out of range: {value}")
+    return income
+
+
+def _measure(query: Query) -> typing.Optional[inflation.InflationMeasure]:
+    values = query.get("measure", [])
+    if len(values) == 0:
+        return None
+    try:
+        return inflation.InflationMeasure(_one(query, "measure").upper())
+    except ValueError:
+        raise BadRequest(f"Unknown measure: {values[0]}")
+
+
+def _percentile(values: typing.Collection[float], q: float) -> float:
+    # Nearest rank
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def load() -> Service:
+    service = Service(
+        tax_tables=tax.load_tax_tables(),
+        inflations={
+            m: inflation.load_inflation(measure=m) for m in inflation.InflationMeasure
+        },
+    )
+    # Warm every table & inflation adjusted view before the first request
+    for measure in [None, *inflation.InflationMeasure]:
+        for table in service.tables_for(measure).year_tables:
+            table.calculate_tax_many(np.zeros(1, dtype=np.int64))
+
+    return service
+
+
+async def _serve(host: str, port: int) -> None:
+    server = await load().serve(host, port)
+    print(f"Serving on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def _main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m analysis.service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
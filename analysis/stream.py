@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+import codecs
+import json
+import typing
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+
+
+@dataclass(frozen=True)
+class Element:
+    value: typing.Any
+    # Byte offsets of the element's JSON in the file, end exclusive
+    start: int
+    end: int
+
+
+def iter_array(
+    fname: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> typing.Iterator[Element]:
+    # Decodes a top level JSON array one element at a time, reading the file in
+    # chunks. Only the element being decoded, and the rest of its chunk, is held in
+    # memory.
+    with open(fname, "rb") as fh:
+        yield from iter_array_from(fh, chunk_size)
+
+
+def iter_array_from(
+    fh: typing.BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> typing.Iterator[Element]:
+    # Offsets are relative to where fh was when this was called
+    return _Reader(fh, chunk_size).elements()
+
+
+class _Reader:
+
+    def __init__(self, fh: typing.BinaryIO, chunk_size: int) -> None:
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        # Byte offset of self._pos in the file
+        self._offset = 0
+        self._eof = False
+
+    def elements(self) -> typing.Iterator[Element]:
+        assert self._next_char() == "[", "Expected a JSON array"
+        self._advance(1)
+        if self._next_char() == "]":
+            self._advance(1)
+            self._check_end()
+            return
+
+        while True:
+            yield self._decode_element()
+            char = self._next_char()
+            if char == "]":
+                self._advance(1)
+                self._check_end()
+                return
+            if char != ",":
+                raise json.JSONDecodeError(
+                    "Expecting ',' delimiter", self._buffer, self._pos
+                )
+            self._advance(1)
+
+    def _decode_element(self) -> Element:
+        # raw_decode doesn't skip leading whitespace
+        self._next_char()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._read()
+                continue
+
+            # A number running up to the end of the buffer may continue in the next
+            # chunk
+            if end == len(self._buffer) and not self._eof:
+                self._read()
+                continue
+
+            start = self._offset
+            self._advance(end - self._pos)
+            return Element(value=value, start=start, end=self._offset)
+
+    def _next_char(self) -> str:
+        # Skips whitespace, and returns the next character, or "" at the end
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._advance(1)
+            if self._eof:
+                return ""
+            self._read()
+
+    def _advance(self, chars: int) -> None:
+        consumed = self._buffer[self._pos : self._pos + chars]
+        self._offset += (
+            len(consumed.encode("utf-8")) if not consumed.isascii() else chars
+        )
+        self._pos += chars
+
+    def _read(self) -> None:
+        # Reads at least as much as is buffered, so an element larger than a chunk
+        # is decoded a logarithmic number of times
+        chunk = self._fh.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        self._eof = len(chunk) == 0
+        self._buffer = self._buffer[self._pos :] + self._decoder.decode(
+            chunk, final=self._eof
+        )
+        self._pos = 0
+
+    def _check_end(self) -> None:
+        char = self._next_char()
+        if char != "":
+            raise json.JSONDecodeError("Extra data", self._buffer, self._pos)
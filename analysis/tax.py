@@ -1,11 +1,33 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import bisect
 import decimal
+import functools
+import io
 import json
+import os
 import typing
-from analysis import parse, inflation
+from analysis import (
+    curves,
+    fixed_point,
+    instrument,
+    memo,
+    parse,
+    inflation,
+    registry,
+    stream,
+)
 
+# numpy is only imported once something vectorised is used, so that scalar
+# calculations start up without it
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+    import pandas as pd
+    import pyarrow as pa  # type: ignore[import-not-found, unused-ignore]
+    from analysis import columnar
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class TaxBracket:
     start: decimal.Decimal
     end: typing.Optional[decimal.Decimal]
@@ -26,17 +48,128 @@ class TaxTable:
     year: int
     brackets: list[TaxBracket]
 
-    def calculate_tax(self, taxable_income: decimal.Decimal) -> decimal.Decimal:
-        tax_amount = decimal.Decimal(0)
-        for bracket in self.brackets:
-            if bracket.start > taxable_income:
-                break
-            tax_amount += bracket.compute_tax(taxable_income)
+    @instrument.timed("tax.calculate_tax")
+    def calculate_tax(
+        self,
+        taxable_income: decimal.Decimal,
+        arithmetic: fixed_point.Arithmetic = fixed_point.Arithmetic.DECIMAL,
+    ) -> decimal.Decimal:
+        # Inflation adjusted tables have boundaries that the compiled table rounds to
+        # cents, so only Decimal arithmetic is exact for them
+        if (
+            arithmetic == fixed_point.Arithmetic.FIXED_POINT
+            and self.fixed_point_table.exact
+        ):
+            return self.fixed_point_table.calculate_tax(taxable_income)
+
+        starts, cumulative_tax = self._bracket_index
+        i = bisect.bisect_right(starts, taxable_income) - 1
+        if i < 0:
+            return decimal.Decimal(0)
+
+        return cumulative_tax[i] + self.brackets[i].compute_tax(taxable_income)
+
+    @functools.cached_property
+    def _bracket_index(self) -> tuple[list[decimal.Decimal], list[decimal.Decimal]]:
+        # cumulative_tax[i] is the tax owed on every bracket below bracket i, summed
+        # in the same order as a bracket by bracket calculation would
+        starts = [b.start for b in self.brackets]
+        cumulative_tax = [decimal.Decimal(0)]
+        for bracket in self.brackets[:-1]:
+            assert bracket.end is not None
+            cumulative_tax.append(cumulative_tax[-1] + bracket.compute_tax(bracket.end))
+
+        return starts, cumulative_tax
+
+    @instrument.timed("tax.calculate_tax_many")
+    def calculate_tax_many(
+        self, taxable_incomes: "npt.NDArray[np.integer[typing.Any]]"
+    ) -> "npt.NDArray[np.float64]":
+        import numpy as np
+
+        assert np.issubdtype(taxable_incomes.dtype, np.integer)
+        incomes = taxable_incomes.astype(np.int64, copy=False)
+        fixed = self.fixed_point_table
+        # Inflation adjusted tables have fractional bracket boundaries, which would
+        # have to be rounded to whole dollars
+        if not fixed.whole_dollars:
+            return self._calculate_tax_many_float(incomes)
+
+        # While tax units stay within 2 ** 53, both operands are exact in float64, so
+        # the division is correctly rounded and matches float() of the Decimal result
+        # from calculate_tax. The few incomes past that are taxed by calculate_tax.
+        scale: int = 10**fixed.digits
+        lo, hi = fixed.income_range(
+            per_dollar=1, max_units=fixed_point.FLOAT_EXACT_UNITS
+        )
+        in_range = (incomes >= lo) & (incomes <= hi)
+        if in_range.all():
+            return fixed.tax_units_many(incomes, per_dollar=1) / scale
+
+        result = np.empty(incomes.shape, dtype=np.float64)
+        result[in_range] = fixed.tax_units_many(incomes[in_range], per_dollar=1) / scale
+        result[~in_range] = [
+            float(self.calculate_tax(decimal.Decimal(int(i))))
+            for i in incomes[~in_range]
+        ]
+        return result
+
+    def _calculate_tax_many_float(
+        self, incomes: "npt.NDArray[np.int64]"
+    ) -> "npt.NDArray[np.float64]":
+        import numpy as np
+
+        tax_amount = np.zeros(incomes.shape, dtype=np.float64)
+        for start, end, rate in self.columns.data.T:
+            capped = np.minimum(incomes, end)
+            tax_amount += np.where(incomes >= start, (capped - start + 1) * rate, 0)
 
         return tax_amount
 
+    def marginal_rate_many(
+        self, taxable_incomes: "npt.NDArray[np.integer[typing.Any]]"
+    ) -> "npt.NDArray[np.float64]":
+        import numpy as np
+
+        columns = self.columns
+        bracket = np.searchsorted(columns.starts, taxable_incomes, side="right") - 1
+        return np.where(bracket >= 0, columns.rates[bracket], 0.0)
+
+    @functools.cached_property
+    def columns(self) -> "columnar.TaxColumns":
+        from analysis import columnar
+
+        return columnar.from_brackets(self.brackets)
+
+    def tax_curve(self) -> curves.PiecewiseLinear:
+        return self._tax_curve
+
+    def marginal_rate_curve(self) -> curves.PiecewiseLinear:
+        return self._tax_curve.derivative()
+
+    def effective_rate_curve(self) -> curves.EffectiveRateCurve:
+        return curves.EffectiveRateCurve(tax=self._tax_curve)
+
+    @functools.cached_property
+    def _tax_curve(self) -> curves.PiecewiseLinear:
+        return curves.tax_curve(self.brackets)
+
+    @functools.cached_property
+    def fixed_point_table(self) -> fixed_point.FixedPointTaxTable:
+        return fixed_point.compile_tax_table(self.brackets)
+
+    @instrument.timed("tax.adjusted_for_inflation")
     def adjusted_for_inflation(
         self, inflate: inflation.Inflation, to_year: int
+    ) -> "TaxTable":
+        return adjusted_views.get_or_compute(
+            (memo.Identity(self), memo.Identity(inflate), to_year),
+            lambda: self._adjusted_for_inflation(inflate, to_year),
+        )
+
+    @instrument.timed("tax.adjusted_for_inflation.compute")
+    def _adjusted_for_inflation(
+        self, inflate: inflation.Inflation, to_year: int
     ) -> "TaxTable":
         last_end: typing.Optional[decimal.Decimal] = self.brackets[0].start
         brackets: list[TaxBracket] = []
@@ -53,14 +186,80 @@ class TaxTable:
         return TaxTable(year=self.year, brackets=brackets)
 
 
+# Inflation adjusted tables, keyed by the source table, inflation data & to_year
+adjusted_views: memo.LruCache[
+    tuple[memo.Identity[TaxTable], memo.Identity[inflation.Inflation], int], TaxTable
+] = memo.LruCache(maxsize=1024)
+# Its keys can't tell which file a table came from, so any invalidation clears it
+registry.default.on_invalidate(adjusted_views.clear)
+
+
 @dataclass(frozen=True)
 class MultiYearTaxTable:
     year_tables: list[TaxTable]
+    # Positions in year_tables, ordered by year
+    _positions: list[int] = field(init=False, repr=False, compare=False)
+    _years: list[int] = field(init=False, repr=False, compare=False)
+    _by_year: dict[int, TaxTable] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        positions = sorted(
+            range(len(self.year_tables)), key=lambda i: self.year_tables[i].year
+        )
+        by_year = {t.year: t for t in self.year_tables}
+        assert len(by_year) == len(self.year_tables), "Duplicate tax table year"
+        object.__setattr__(self, "_positions", positions)
+        object.__setattr__(
+            self, "_years", [self.year_tables[i].year for i in positions]
+        )
+        object.__setattr__(self, "_by_year", by_year)
+
+    @functools.cached_property
+    def columns(self) -> "columnar.MultiYearTaxColumns":
+        from analysis import columnar
+
+        return columnar.from_tables(self.year_tables)
+
+    def to_dataframe(self, exact: bool = False) -> "pd.DataFrame":
+        # One row per bracket, with float columns or, if exact, the Decimals
+        from analysis import frames
+
+        return frames.tax_table_frame(self, exact)
+
+    def to_arrow(self) -> "pa.Table":
+        # Needs pyarrow, which is optional
+        from analysis import frames
 
+        return frames.tax_table_arrow(self)
+
+    @property
+    def latest_year(self) -> int:
+        assert len(self._years) > 0
+        return self._years[-1]
+
+    @property
+    def earliest_year(self) -> int:
+        assert len(self._years) > 0
+        return self._years[0]
+
+    def table_for(self, year: int) -> TaxTable:
+        table = self._by_year.get(year)
+        assert table is not None, f"No tax table for year {year}"
+        return table
+
+    def between(self, from_year: int, to_year: int) -> "MultiYearTaxTable":
+        # Both years are inclusive, and tables keep their order from year_tables
+        lo = bisect.bisect_left(self._years, from_year)
+        hi = bisect.bisect_right(self._years, to_year)
+        return MultiYearTaxTable(
+            year_tables=[self.year_tables[i] for i in sorted(self._positions[lo:hi])]
+        )
+
+    @instrument.timed("tax.multi_year.adjusted_for_inflation")
     def adjusted_for_inflation(
         self, inflate: inflation.Inflation
     ) -> "MultiYearTaxTable":
-        to_year = max(t.year for t in self.year_tables)
+        to_year = self.latest_year
         return MultiYearTaxTable(
             year_tables=[
                 t.adjusted_for_inflation(inflate, to_year=to_year)
@@ -69,9 +268,163 @@ class MultiYearTaxTable:
         )
 
 
-def load_tax_tables(fname: str = "data/aus_tax_table.json") -> MultiYearTaxTable:
-    with open(fname, "r") as fh:
-        return _load_tax_tables_from_content(json.load(fh))
+@dataclass(frozen=True)
+class TaxTableIndex:
+    # The mtime & size of the source the entries were checked against
+    signature: tuple[int, int]
+    # Each table's year, and the byte offsets of its JSON in the source, in file order
+    entries: list[tuple[int, int, int]]
+
+
+@dataclass(frozen=True)
+class LazyMultiYearTaxTable:
+    # Reads & validates each year's table from the source the first time it's asked
+    # for, and keeps it. Every read checks the source is still the one indexed.
+    fname: str
+    index: TaxTableIndex
+    _offsets: dict[int, tuple[int, int]] = field(init=False, repr=False, compare=False)
+    _years: list[int] = field(init=False, repr=False, compare=False)
+    _tables: dict[int, TaxTable] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        offsets = {year: (start, end) for year, start, end in self.index.entries}
+        assert len(offsets) == len(self.index.entries), "Duplicate tax table year"
+        object.__setattr__(self, "_offsets", offsets)
+        object.__setattr__(self, "_years", sorted(offsets))
+        object.__setattr__(self, "_tables", {})
+
+    @property
+    def years(self) -> list[int]:
+        return [year for year, _, _ in self.index.entries]
+
+    @property
+    def latest_year(self) -> int:
+        assert len(self._years) > 0
+        return self._years[-1]
+
+    @property
+    def earliest_year(self) -> int:
+        assert len(self._years) > 0
+        return self._years[0]
+
+    def table_for(self, year: int) -> TaxTable:
+        table = self._tables.get(year)
+        if table is not None:
+            return table
+
+        offsets = self._offsets.get(year)
+        assert offsets is not None, f"No tax table for year {year}"
+        table = self._read_table(*offsets)
+        assert table.year == year, f"{self.fname} doesn't match its index"
+        self._tables[year] = table
+        return table
+
+    def _read_table(self, start: int, end: int) -> TaxTable:
+        with open(self.fname, "rb") as fh:
+            assert (
+                _signature(os.fstat(fh.fileno())) == self.index.signature
+            ), f"{self.fname} has changed since it was indexed"
+            fh.seek(start)
+            return _load_tax_table(json.loads(fh.read(end - start)))
+
+    @property
+    def year_tables(self) -> list[TaxTable]:
+        return [self.table_for(year) for year in self.years]
+
+    def between(self, from_year: int, to_year: int) -> MultiYearTaxTable:
+        # Only reads the tables in range
+        return MultiYearTaxTable(
+            year_tables=[
+                self.table_for(year)
+                for year in self.years
+                if from_year <= year <= to_year
+            ]
+        )
+
+    def to_multi_year(self) -> MultiYearTaxTable:
+        return MultiYearTaxTable(year_tables=self.year_tables)
+
+    def adjusted_for_inflation(self, inflate: inflation.Inflation) -> MultiYearTaxTable:
+        return self.to_multi_year().adjusted_for_inflation(inflate)
+
+
+@typing.overload
+def load_tax_tables(
+    fname: str = ...,
+    use_cache: bool = ...,
+    lazy: typing.Literal[False] = ...,
+) -> MultiYearTaxTable: ...
+
+
+@typing.overload
+def load_tax_tables(
+    fname: str = ...,
+    use_cache: bool = ...,
+    *,
+    lazy: typing.Literal[True],
+) -> LazyMultiYearTaxTable: ...
+
+
+@instrument.timed("tax.load_tax_tables")
+def load_tax_tables(
+    fname: str = "data/aus_tax_table.json", use_cache: bool = True, lazy: bool = False
+) -> typing.Union[MultiYearTaxTable, LazyMultiYearTaxTable]:
+    if lazy:
+        # Only the index is cached, as the tables are read from the source. So unlike
+        # the tables, it's always checked against the current source. Its offsets
+        # only depend on the content, which the disk cache checks, so a touched
+        # source is reindexed from neither.
+        if not use_cache:
+            return LazyMultiYearTaxTable(fname=fname, index=_index_tax_tables_in(fname))
+
+        # Taken first, so a change while loading fails the reads rather than passing
+        signature = _signature(os.stat(fname))
+        entries = registry.default.load(
+            fname, "tax_table_index", _index_tax_tables, parse=io.BytesIO, watch=True
+        )
+        return LazyMultiYearTaxTable(
+            fname=fname, index=TaxTableIndex(signature=signature, entries=entries)
+        )
+
+    if use_cache:
+        return registry.default.load(fname, "tax_tables", _load_tax_tables_from_content)
+
+    return MultiYearTaxTable(year_tables=list(iter_tax_tables(fname)))
+
+
+def _signature(stat: os.stat_result) -> tuple[int, int]:
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _index_tax_tables_in(fname: str) -> TaxTableIndex:
+    with open(fname, "rb") as fh:
+        return TaxTableIndex(
+            signature=_signature(os.fstat(fh.fileno())),
+            entries=_index_tax_tables(fh),
+        )
+
+
+def _index_tax_tables(fh: typing.BinaryIO) -> list[tuple[int, int, int]]:
+    entries: list[tuple[int, int, int]] = []
+    for element in stream.iter_array_from(fh):
+        assert type(element.value) == dict
+        fy = element.value["year"]
+        assert type(fy) == str
+        entries.append((parse.parse_financial_year(fy), element.start, element.end))
+
+    return entries
+
+
+def iter_tax_tables(
+    fname: str = "data/aus_tax_table.json",
+) -> typing.Iterator[TaxTable]:
+    # Validates and yields each table as it's read, without holding the whole file
+    seen_years: set[int] = set()
+    for element in stream.iter_array(fname):
+        table = _load_tax_table(element.value)
+        assert table.year not in seen_years, f"Duplicate tax table year {table.year}"
+        seen_years.add(table.year)
+        yield table
 
 
 def _load_tax_tables_from_content(
@@ -81,6 +434,7 @@ def _load_tax_tables_from_content(
     return MultiYearTaxTable(year_tables=[_load_tax_table(e) for e in content])
 
 
+@instrument.timed("tax.parse_tax_table")
 def _load_tax_table(content: dict[typing.Any, typing.Any]) -> TaxTable:
     assert type(content) == dict
     fy = content["year"]
@@ -89,19 +443,9 @@ def _load_tax_table(content: dict[typing.Any, typing.Any]) -> TaxTable:
     assert type(brackets_data) == list
 
     year = parse.parse_financial_year(fy)
-    brackets: list[TaxBracket] = []
-    for b in brackets_data:
-        bracket = _load_tax_bracket(b, fy=fy)
-        if len(brackets) > 0:
-            assert brackets[-1].end is not None
-            assert (
-                bracket.start == brackets[-1].end + 1
-            ), f"Non contiguous tax bracket in fy {fy}: {bracket.start}"
-        else:
-            assert bracket.start == 0
-        brackets.append(bracket)
-    assert len(brackets) > 0
-    assert brackets[-1].end is None
+    brackets = [_load_tax_bracket(b, fy=fy) for b in brackets_data]
+    _validate_brackets(brackets, fy=fy)
+    instrument.count("tax.brackets_parsed", len(brackets))
 
     return TaxTable(
         year=year,
@@ -109,6 +453,19 @@ def _load_tax_table(content: dict[typing.Any, typing.Any]) -> TaxTable:
     )
 
 
+def _validate_brackets(brackets: typing.Sequence[TaxBracket], fy: str) -> None:
+    # What every table must hold, whether it was loaded or derived from another.
+    # Each bracket is checked on its own by _validate_bracket.
+    assert len(brackets) > 0
+    assert brackets[0].start == 0
+    for previous, bracket in zip(brackets, brackets[1:]):
+        assert previous.end is not None
+        assert (
+            bracket.start == previous.end + 1
+        ), f"Non contiguous tax bracket in fy {fy}: {bracket.start}"
+    assert brackets[-1].end is None
+
+
 def _load_tax_bracket(content: dict[typing.Any, typing.Any], fy: str) -> TaxBracket:
     assert type(content) == dict
     b_min = content["min"]
@@ -119,14 +476,18 @@ def _load_tax_bracket(content: dict[typing.Any, typing.Any], fy: str) -> TaxBrac
     assert type(b_rate) == str
 
     bracket = TaxBracket(
-        start=decimal.Decimal(b_min),
-        end=decimal.Decimal(b_max) if b_max is not None else None,
-        rate=decimal.Decimal(b_rate),
+        start=parse.parse_decimal(b_min),
+        end=parse.parse_decimal(b_max) if b_max is not None else None,
+        rate=parse.parse_decimal(b_rate),
     )
+    _validate_bracket(bracket, fy=fy)
+
+    return bracket
+
+
+def _validate_bracket(bracket: TaxBracket, fy: str) -> None:
     assert (
         bracket.end is None or bracket.start < bracket.end
     ), f"Invalid tax bracket range in {fy}: {bracket.start} to {bracket.end}"
     assert bracket.rate >= 0
     assert bracket.rate <= 1
-
-    return bracket
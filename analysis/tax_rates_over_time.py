@@ -1,7 +1,12 @@
-import matplotlib.pyplot as plt
-import pandas as pd
 import typing
-from analysis import tax, labels, inflation
+from analysis import instrument, tax, labels, inflation
+
+if typing.TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.collections import PathCollection
+    from matplotlib.figure import Figure
+    import numpy as np
+    import numpy.typing as npt
 
 
 def _show_tax_tables(
@@ -13,42 +18,66 @@ def _show_tax_tables(
             inflation.load_inflation(measure=inflation_adjusted)
         )
 
-    rows = []
-    for year in tax_tables.year_tables:
-        for bracket in year.brackets:
-            rows.append(
-                {
-                    "year": labels.financial_year(year.year),
-                    "start": bracket.start,
-                    "rate": f"{bracket.rate * 100:.0f}%",
-                }
-            )
-    rows.sort(key=lambda r: (r["year"], r["start"]))
-    x_to_fy = labels.create_x_to_fy([r["year"] for r in rows])  # type: ignore[misc]
-
-    df = pd.DataFrame(rows)
-    _, ax = plt.subplots()
-    df.plot.scatter(
-        x="year",
-        y="start",
-        ax=ax,
-        figsize=(14, 6),
-        ylabel="Tax bracket in $",
-    )
+    import matplotlib.pyplot as plt
 
-    for _, row in df.iterrows():
-        ax.annotate(
-            row["rate"],
-            (row["year"], row["start"]),
-            xytext=(10, 10),
-            textcoords="offset pixels",
-        )
+    _plot_tax_tables(plt.figure(), tax_tables)
+    plt.show()
+
+
+@instrument.timed("render.tax_rates_over_time")
+def _plot_tax_tables(fig: "Figure", tax_tables: tax.MultiYearTaxTable) -> None:
+    import numpy as np
+    import pandas as pd
+
+    df = tax_tables.to_dataframe().sort_values("year", kind="stable")
+    x, fy_index = pd.factorize(df["fy"])
+    fy_labels = fy_index.tolist()
+    starts = df["start"].to_numpy()
+    rates = np.char.mod("%.0f%%", df["rate"].to_numpy() * 100)
+    x_to_fy = labels.create_x_to_fy(fy_labels)
 
-    plt.xticks(rotation=40)
-    plt.gca().format_coord = (  # type: ignore[method-assign]
+    fig.set_size_inches(14, 6)
+    ax = fig.subplots()
+    ax.scatter(x, starts, s=20)
+    ax.add_collection(_rate_labels(fig, ax, x, starts, rates), autolim=False)
+
+    ax.set_xticks(range(len(fy_labels)), fy_labels, rotation=40)
+    ax.set_ylabel("Tax bracket in $")
+    ax.format_coord = (  # type: ignore[method-assign]
         lambda x, y: f"fy={x_to_fy(x)}, ${y:,.0f}"
     )
-    plt.show()
+
+
+def _rate_labels(
+    fig: "Figure",
+    ax: "Axes",
+    x: "npt.NDArray[np.int64]",
+    y: "npt.NDArray[np.float64]",
+    rates: "npt.NDArray[np.str_]",
+) -> "PathCollection":
+    import matplotlib
+    from matplotlib import transforms
+    from matplotlib.collections import PathCollection
+    from matplotlib.textpath import TextPath
+    import numpy as np
+
+    # Every label is drawn by a single collection, 10 pixels up & right of its point,
+    # rather than one annotation artist per bracket. There are only a handful of
+    # distinct rates, so their glyph outlines are shared.
+    size = matplotlib.rcParams["font.size"]
+    paths = {rate: TextPath((0, 0), rate, size=size) for rate in set(rates)}
+    return PathCollection(
+        [paths[r] for r in rates],
+        # Text paths are in points, which a size of 1 scales to pixels
+        sizes=[1.0],
+        transform=transforms.IdentityTransform(),
+        offsets=np.column_stack([x, y]),
+        offset_transform=transforms.offset_copy(
+            ax.transData, fig=fig, x=10, y=10, units="dots"
+        ),
+        facecolors=matplotlib.rcParams["text.color"],
+        edgecolors="none",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+import json
+import math
+import numpy as np
+import unittest
+from analysis import bracket_creep, inflation, tax
+
+
+class BracketCreepTests(unittest.TestCase):
+
+    def test_shape(self) -> None:
+        result = self._compute()
+
+        self.assertEqual(result.years.tolist(), [2020, 2021, 2022, 2023])
+        self.assertEqual(result.measures, list(inflation.InflationMeasure))
+        self.assertEqual(result.factors.shape, (2, 4, 4))
+        self.assertEqual(result.thresholds.shape, (2, 4, 4, 3))
+        self.assertEqual(result.rates.shape, (4, 3))
+
+    def test_factor(self) -> None:
+        result = self._compute()
+        cpi, wpi = inflation.InflationMeasure.CPI, inflation.InflationMeasure.WPI
+
+        self.assertAlmostEqual(result.factor(cpi, 2021, 2023), 1.05 * 1.03)
+        self.assertAlmostEqual(result.factor(cpi, 2023, 2021), 1 / (1.05 * 1.03))
+        self.assertAlmostEqual(result.factor(wpi, 2022, 2023), 1.03)
+        self.assertEqual(result.factor(cpi, 2022, 2022), 1)
+
+    def test_factor_without_data(self) -> None:
+        result = self._compute()
+
+        self.assertTrue(
+            math.isnan(result.factor(inflation.InflationMeasure.CPI, 2020, 2023))
+        )
+
+    def test_factor_missing_year(self) -> None:
+        with self.assertRaises(AssertionError):
+            self._compute().factor(inflation.InflationMeasure.CPI, 2019, 2023)
+
+    def test_thresholds_in(self) -> None:
+        result = self._compute().thresholds_in(inflation.InflationMeasure.CPI, 2023)
+
+        np.testing.assert_allclose(
+            result,
+            [
+                [np.nan, np.nan, np.nan],
+                [0.0, 101 * 1.0815, np.nan],
+                [0.0, np.nan, np.nan],
+                [0.0, 101.0, 301.0],
+            ],
+        )
+
+    def test_matches_adjust(self) -> None:
+        tax_tables = self._load_tax_tables()
+        inflations = self._load_inflations()
+        result = bracket_creep.compute(tax_tables, inflations)
+        years = [int(y) for y in result.years]
+
+        for m, measure in enumerate(result.measures):
+            for i, from_year in enumerate(years):
+                if from_year < 2021:
+                    continue
+                for j, to_year in enumerate(years):
+                    if to_year < from_year:
+                        continue
+                    for k, b in enumerate(tax_tables.table_for(from_year).brackets):
+                        self.assertAlmostEqual(
+                            result.thresholds[m, i, j, k],
+                            float(
+                                inflations[measure].adjust(b.start, from_year, to_year)
+                            ),
+                        )
+
+    def test_rates(self) -> None:
+        result = self._compute()
+
+        np.testing.assert_allclose(
+            result.rates,
+            [
+                [0.1, np.nan, np.nan],
+                [0.0, 0.3, np.nan],
+                [0.5, np.nan, np.nan],
+                [0.0, 0.3, 0.45],
+            ],
+        )
+
+    def _compute(self) -> bracket_creep.BracketCreep:
+        return bracket_creep.compute(self._load_tax_tables(), self._load_inflations())
+
+    def _load_tax_tables(self) -> tax.MultiYearTaxTable:
+        tables = """
+        [
+          {
+            "year": "2023-24",
+            "brackets": [
+              {"min": "0", "max": "100", "rate": "0"},
+              {"min": "101", "max": "300", "rate": "0.3"},
+              {"min": "301", "max": null, "rate": "0.45"}
+            ]
+          },
+          {
+            "year": "2022-23",
+            "brackets": [{"min": "0", "max": null, "rate": "0.5"}]
+          },
+          {
+            "year": "2021-22",
+            "brackets": [
+              {"min": "0", "max": "100", "rate": "0"},
+              {"min": "101", "max": null, "rate": "0.3"}
+            ]
+          },
+          {
+            "year": "2020-21",
+            "brackets": [{"min": "0", "max": null, "rate": "0.1"}]
+          }
+        ]
+        """
+        return tax._load_tax_tables_from_content(json.loads(tables))
+
+    def _load_inflations(
+        self,
+    ) -> dict[inflation.InflationMeasure, inflation.Inflation]:
+        data = """
+        [
+          {"year": "2023-24", "cpi": "0.02", "wpi": "0.04"},
+          {"year": "2022-23", "cpi": "0.03", "wpi": "0.03"},
+          {"year": "2021-22", "cpi": "0.05", "wpi": "0.02"}
+        ]
+        """
+        return inflation._load_all_measures(json.loads(data))
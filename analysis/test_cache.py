@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import typing
+import unittest
+from analysis import cache
+
+
+class LoadCompiledTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._fname = os.path.join(self._dir.name, "data.json")
+        self._compiled: list[typing.Any] = []
+        self._write([1, 2, 3])
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def test_compiles_on_first_load(self) -> None:
+        result = self._load()
+
+        self.assertEqual(result, 6)
+        self.assertEqual(self._compiled, [[1, 2, 3]])
+
+    def test_reuses_cache(self) -> None:
+        self._load()
+
+        result = self._load()
+
+        self.assertEqual(result, 6)
+        self.assertEqual(len(self._compiled), 1)
+
+    def test_recompiles_when_source_changes(self) -> None:
+        self._load()
+        self._write([1, 2, 3, 4])
+
+        result = self._load()
+
+        self.assertEqual(result, 10)
+        self.assertEqual(len(self._compiled), 2)
+
+    def test_reuses_cache_when_source_touched(self) -> None:
+        self._load()
+        stat = os.stat(self._fname)
+        os.utime(self._fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result = self._load()
+
+        self.assertEqual(result, 6)
+        self.assertEqual(len(self._compiled), 1)
+
+    def test_recompiles_when_cache_corrupt(self) -> None:
+        self._load()
+        cache_dir = os.path.join(self._dir.name, "__pycache__")
+        for f in os.listdir(cache_dir):
+            with open(os.path.join(cache_dir, f), "wb") as fh:
+                fh.write(b"not a cache")
+
+        result = self._load()
+
+        self.assertEqual(result, 6)
+        self.assertEqual(len(self._compiled), 2)
+
+    def test_recompiles_when_payload_truncated(self) -> None:
+        self._load()
+        self._truncate_cache()
+
+        result = self._load()
+
+        self.assertEqual(result, 6)
+        self.assertEqual(len(self._compiled), 2)
+        # And the cache is rewritten
+        self._load()
+        self.assertEqual(len(self._compiled), 2)
+
+    def test_recompiles_when_touched_payload_truncated(self) -> None:
+        self._load()
+        self._truncate_cache()
+        stat = os.stat(self._fname)
+        os.utime(self._fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result = self._load()
+
+        self.assertEqual(result, 6)
+        self.assertEqual(len(self._compiled), 2)
+
+    def test_separate_names(self) -> None:
+        self._load()
+
+        result = cache.load_compiled(self._fname, "count", len)
+
+        self.assertEqual(result, 3)
+
+    def test_parse(self) -> None:
+        result = cache.load_compiled(self._fname, "raw", len, parse=lambda b: b)
+
+        self.assertEqual(result, len(b"[1, 2, 3]"))
+
+    def _truncate_cache(self) -> None:
+        # Keeps the header, which is only a few dozen bytes, and cuts the payload
+        cache_dir = os.path.join(self._dir.name, "__pycache__")
+        for f in os.listdir(cache_dir):
+            fname = os.path.join(cache_dir, f)
+            with open(fname, "rb") as fh:
+                content = fh.read()
+            with open(fname, "wb") as fh:
+                fh.write(content[:-2])
+
+    def _load(self) -> int:
+        return cache.load_compiled(self._fname, "sum", self._compile)
+
+    def _compile(self, content: typing.Any) -> int:
+        self._compiled.append(content)
+        return sum(content)
+
+    def _write(self, content: typing.Any) -> None:
+        # Keep the mtime moving even on filesystems with coarse timestamps
+        mtime_ns = (
+            os.stat(self._fname).st_mtime_ns if os.path.exists(self._fname) else 0
+        )
+        with open(self._fname, "w") as fh:
+            json.dump(content, fh)
+        if os.stat(self._fname).st_mtime_ns == mtime_ns:
+            os.utime(self._fname, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
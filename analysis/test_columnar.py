@@ -0,0 +1,107 @@
+import json
+import math
+import numpy as np
+import unittest
+from analysis import tax
+
+
+class TaxColumnsTests(unittest.TestCase):
+
+    def test_columns(self) -> None:
+        columns = self._load_tables().table_for(2024).columns
+
+        self.assertEqual(columns.starts.tolist(), [0, 101])
+        self.assertEqual(columns.ends.tolist(), [100, math.inf])
+        self.assertEqual(columns.rates.tolist(), [0, 0.3])
+
+    def test_rows_are_contiguous(self) -> None:
+        columns = self._load_tables().table_for(2024).columns
+
+        self.assertTrue(columns.starts.flags["C_CONTIGUOUS"])
+        self.assertTrue(columns.rates.flags["C_CONTIGUOUS"])
+
+    def test_to_pandas_zero_copy(self) -> None:
+        columns = self._load_tables().table_for(2024).columns
+
+        df = columns.to_pandas()
+
+        self.assertEqual(list(df.columns), ["start", "end", "rate"])
+        self.assertEqual(df["rate"].tolist(), [0, 0.3])
+        self.assertTrue(np.shares_memory(df.to_numpy(), columns.to_numpy()))
+
+    def test_read_only(self) -> None:
+        table = self._load_tables().table_for(2024)
+        df = table.columns.to_pandas()
+
+        with self.assertRaises(ValueError):
+            df.iloc[1, 0] = -1e9
+        self.assertEqual(table.marginal_rate_many(np.array([50])).tolist(), [0])
+
+    def _load_tables(self) -> tax.MultiYearTaxTable:
+        return _load_tables()
+
+
+class MultiYearTaxColumnsTests(unittest.TestCase):
+
+    def test_flattened(self) -> None:
+        columns = self._load_tables().columns
+
+        self.assertEqual(columns.years.tolist(), [2024, 2023])
+        self.assertEqual(columns.offsets.tolist(), [0, 2, 5])
+        self.assertEqual(columns.columns.starts.tolist(), [0, 101, 0, 51, 201])
+        self.assertEqual(columns.bracket_years().tolist(), [2024] * 2 + [2023] * 3)
+
+    def test_table_is_view(self) -> None:
+        columns = self._load_tables().columns
+
+        result = columns.table(1)
+
+        self.assertEqual(result.starts.tolist(), [0, 51, 201])
+        self.assertEqual(result.rates.tolist(), [0, 0.2, 0.4])
+        self.assertTrue(np.shares_memory(result.data, columns.columns.data))
+
+    def test_to_pandas_zero_copy(self) -> None:
+        columns = self._load_tables().columns
+
+        df = columns.to_pandas()
+
+        self.assertEqual(df.index.name, "year")
+        self.assertEqual(df["start"][df.index == 2023].tolist(), [0, 51, 201])
+        self.assertTrue(np.shares_memory(df.to_numpy(), columns.to_numpy()))
+
+    def test_read_only(self) -> None:
+        columns = self._load_tables().columns
+
+        self.assertFalse(columns.years.flags.writeable)
+        self.assertFalse(columns.offsets.flags.writeable)
+        self.assertFalse(columns.table(1).data.flags.writeable)
+        df = columns.to_pandas()
+
+        with self.assertRaises(ValueError):
+            df.iloc[0, 0] = -1e9
+
+    def _load_tables(self) -> tax.MultiYearTaxTable:
+        return _load_tables()
+
+
+def _load_tables() -> tax.MultiYearTaxTable:
+    tables = """
+    [
+      {
+        "year": "2024-25",
+        "brackets": [
+          {"min": "0", "max": "100", "rate": "0"},
+          {"min": "101", "max": null, "rate": "0.3"}
+        ]
+      },
+      {
+        "year": "2023-24",
+        "brackets": [
+          {"min": "0", "max": "50", "rate": "0"},
+          {"min": "51", "max": "200", "rate": "0.2"},
+          {"min": "201", "max": null, "rate": "0.4"}
+        ]
+      }
+    ]
+    """
+    return tax._load_tax_tables_from_content(json.loads(tables))
@@ -0,0 +1,265 @@
+import decimal
+import json
+import numpy as np
+import unittest
+from analysis import curves, inflation, tax
+
+
+class TaxCurveTests(unittest.TestCase):
+
+    def test_segments(self) -> None:
+        result = self._load_table().tax_curve()
+
+        self.assertEqual(
+            result.breakpoints,
+            [
+                decimal.Decimal("-Infinity"),
+                *[decimal.Decimal(v) for v in [0, 100, 101, 300, 301, 500, 501]],
+            ],
+        )
+        self.assertEqual(
+            result.slopes,
+            [
+                decimal.Decimal(v)
+                for v in ["0", "0", "0", "0.3", "0", "0.325", "0", "0.45"]
+            ],
+        )
+        self.assertEqual(
+            result.intercepts,
+            [
+                decimal.Decimal(v)
+                for v in ["0", "0", "0", "-30", "60", "-37.5", "125", "-100"]
+            ],
+        )
+
+    def test_matches_calculate_tax(self) -> None:
+        table = self._load_table()
+        curve = table.tax_curve()
+
+        for income in [
+            "-1",
+            "0",
+            "50",
+            "100",
+            "100.5",
+            "101",
+            "299.99",
+            "300",
+            "300.5",
+            "301",
+            "500",
+            "501",
+            "1234.56",
+        ]:
+            with self.subTest(income=income):
+                self.assertEqual(
+                    curve(decimal.Decimal(income)),
+                    table.calculate_tax(decimal.Decimal(income)),
+                )
+
+    def test_matches_calculate_tax_on_data(self) -> None:
+        for table in tax.load_tax_tables(use_cache=False).year_tables:
+            curve = table.tax_curve()
+            for income in [
+                amount + offset
+                for b in table.brackets
+                for amount in [b.start, b.end or b.start]
+                for offset in [
+                    decimal.Decimal(v) for v in ["-1", "-0.5", "0", "0.5", "1"]
+                ]
+            ]:
+                self.assertEqual(curve(income), table.calculate_tax(income))
+
+    def test_matches_calculate_tax_adjusted(self) -> None:
+        # The boundaries use every digit of precision, so the two calculations can
+        # round differently in the last place
+        table = self._load_table().adjusted_for_inflation(
+            self._load_inflation(), to_year=2024
+        )
+        curve = table.tax_curve()
+
+        for income in [
+            decimal.Decimal(v) for v in ["50", "105", "200.5", "310", "600"]
+        ]:
+            with self.subTest(income=income):
+                self.assertAlmostEqual(
+                    curve(income),
+                    table.calculate_tax(income),
+                    delta=decimal.Decimal("1e-20"),
+                )
+
+    def test_evaluate_many(self) -> None:
+        table = self._load_table()
+        incomes = np.arange(0, 1000)
+
+        result = table.tax_curve().evaluate_many(incomes)
+
+        np.testing.assert_allclose(result, table.calculate_tax_many(incomes))
+
+    def test_capped_top_bracket(self) -> None:
+        curve = curves.tax_curve(
+            [
+                tax.TaxBracket(
+                    start=decimal.Decimal(0),
+                    end=decimal.Decimal(99),
+                    rate=decimal.Decimal("0.1"),
+                )
+            ]
+        )
+
+        self.assertEqual(curve(decimal.Decimal(1000)), decimal.Decimal(10))
+
+    def test_integral(self) -> None:
+        curve = self._load_table().tax_curve()
+
+        result = curve.integral(decimal.Decimal(0), decimal.Decimal(300))
+
+        # 0.15 * (300^2 - 101^2) - 30 * (300 - 101)
+        self.assertEqual(result, decimal.Decimal("5999.85"))
+
+    def test_integral_is_additive(self) -> None:
+        curve = self._load_table().tax_curve()
+        a, b, c = [decimal.Decimal(v) for v in ["-50", "250.5", "800"]]
+
+        self.assertEqual(
+            curve.integral(a, b) + curve.integral(b, c), curve.integral(a, c)
+        )
+
+    def test_integral_backwards(self) -> None:
+        with self.assertRaises(AssertionError):
+            self._load_table().tax_curve().integral(
+                decimal.Decimal(10), decimal.Decimal(5)
+            )
+
+    def test_marginal_rate_curve(self) -> None:
+        curve = self._load_table().marginal_rate_curve()
+
+        self.assertEqual(
+            [curve(decimal.Decimal(i)) for i in ["50", "250", "300.5", "400", "600"]],
+            [decimal.Decimal(v) for v in ["0", "0.3", "0", "0.325", "0.45"]],
+        )
+
+    def _load_table(self) -> tax.TaxTable:
+        table = """
+        {
+          "year": "2022-23",
+          "brackets": [
+            {
+              "min": "0",
+              "max": "100",
+              "rate": "0"
+            },
+            {
+              "min": "101",
+              "max": "300",
+              "rate": "0.30"
+            },
+            {
+              "min": "301",
+              "max": "500",
+              "rate": "0.325"
+            },
+            {
+              "min": "501",
+              "max": null,
+              "rate": "0.45"
+            }
+          ]
+        }
+        """
+        return tax._load_tax_table(json.loads(table))
+
+    def _load_inflation(self) -> inflation.Inflation:
+        data = """
+        [
+          {
+            "year": "2023-24",
+            "cpi": "0.0217"
+          },
+          {
+            "year": "2022-23",
+            "cpi": "0.0333"
+          }
+        ]
+        """
+        return inflation._load_inflation_from_content(
+            json.loads(data), inflation.InflationMeasure.CPI
+        )
+
+
+class EffectiveRateCurveTests(unittest.TestCase):
+
+    def test_call(self) -> None:
+        curve = self._load_table().effective_rate_curve()
+
+        self.assertEqual(curve(decimal.Decimal(200)), decimal.Decimal("0.15"))
+
+    def test_call_non_positive(self) -> None:
+        with self.assertRaises(AssertionError):
+            self._load_table().effective_rate_curve()(decimal.Decimal(0))
+
+    def test_evaluate_many(self) -> None:
+        table = self._load_table()
+        incomes = np.arange(1, 1000)
+
+        result = table.effective_rate_curve().evaluate_many(incomes)
+
+        np.testing.assert_allclose(result, table.calculate_tax_many(incomes) / incomes)
+
+    def test_integral(self) -> None:
+        curve = self._load_table().effective_rate_curve()
+
+        result = curve.integral(decimal.Decimal(200), decimal.Decimal(250))
+
+        self.assertEqual(result, 15 - 30 * decimal.Decimal("1.25").ln())
+
+    def test_integral_across_segments(self) -> None:
+        curve = self._load_table().effective_rate_curve()
+        lo, hi = decimal.Decimal(50), decimal.Decimal(1000)
+
+        # Against the midpoint rule over a fine grid
+        steps = 100_000
+        width = float(hi - lo) / steps
+        midpoints = np.linspace(float(lo) + width / 2, float(hi) - width / 2, steps)
+        expected = curve.evaluate_many(midpoints).sum() * width
+
+        self.assertAlmostEqual(float(curve.integral(lo, hi)), expected, places=3)
+        self.assertAlmostEqual(
+            float(curve.average(lo, hi)), expected / float(hi - lo), places=6
+        )
+
+    def test_integral_from_zero(self) -> None:
+        with self.assertRaises(AssertionError):
+            self._load_table().effective_rate_curve().integral(
+                decimal.Decimal(0), decimal.Decimal(100)
+            )
+
+    def _load_table(self) -> tax.TaxTable:
+        table = """
+        {
+          "year": "2022-23",
+          "brackets": [
+            {
+              "min": "0",
+              "max": "100",
+              "rate": "0"
+            },
+            {
+              "min": "101",
+              "max": "300",
+              "rate": "0.30"
+            },
+            {
+              "min": "301",
+              "max": "500",
+              "rate": "0.325"
+            },
+            {
+              "min": "501",
+              "max": null,
+              "rate": "0.45"
+            }
+          ]
+        }
+        """
+        return tax._load_tax_table(json.loads(table))
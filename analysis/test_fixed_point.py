@@ -0,0 +1,257 @@
+import decimal
+import json
+import numpy as np
+import unittest
+from analysis import fixed_point, inflation, tax
+
+
+class FixedPointTaxTableTests(unittest.TestCase):
+
+    def test_compile(self) -> None:
+        result = self._load_table().fixed_point_table
+
+        self.assertEqual(result.digits, 3)
+        self.assertEqual(result.starts, [0, 10100, 30100, 50100])
+        self.assertEqual(result.ends, [10000, 30000, 50000, None])
+        self.assertEqual(result.rates, [0, 300, 325, 450])
+        self.assertEqual(result.cumulative_tax, [0, 0, 6000000, 12500000])
+        self.assertTrue(result.exact)
+        self.assertTrue(result.whole_dollars)
+
+    def test_calculate_tax(self) -> None:
+        table = self._load_table()
+
+        for income in ["0", "100", "101", "250.50", "300", "301.01", "500", "1000"]:
+            with self.subTest(income=income):
+                self.assertEqual(
+                    table.calculate_tax(
+                        decimal.Decimal(income),
+                        arithmetic=fixed_point.Arithmetic.FIXED_POINT,
+                    ),
+                    table.calculate_tax(decimal.Decimal(income)),
+                )
+
+    def test_calculate_tax_rounds_income_to_cents(self) -> None:
+        result = self._load_table().calculate_tax(
+            decimal.Decimal("250.005"), arithmetic=fixed_point.Arithmetic.FIXED_POINT
+        )
+
+        self.assertEqual(result, decimal.Decimal("45"))
+
+    def test_calculate_tax_cents(self) -> None:
+        table = self._load_table().fixed_point_table
+
+        # 60.32825 and 125.585, rounded half to even
+        self.assertEqual(table.calculate_tax_cents(decimal.Decimal("301.01")), 6033)
+        self.assertEqual(table.calculate_tax_cents(decimal.Decimal("501.30")), 12558)
+
+    def test_tax_units_many(self) -> None:
+        table = self._load_table().fixed_point_table
+
+        cents = table.tax_units_many(np.array([0, 10100, 30101, 100000]))
+        dollars = table.tax_units_many(np.array([0, 101, 301, 1000]), per_dollar=1)
+
+        self.assertEqual(cents.tolist(), [0, 30000, 6032825, 35000000])
+        self.assertEqual(dollars.tolist(), [0, 300, 60325, 350000])
+
+    def test_tax_units_many_overflow(self) -> None:
+        table = self._load_table().fixed_point_table
+        incomes = np.array([10**18])
+
+        self.assertTrue(table.fits_int64(incomes // 100))
+        self.assertFalse(table.fits_int64(incomes))
+        self.assertFalse(table.fits_int64(incomes, per_dollar=1))
+        self.assertFalse(table.fits_int64(np.array([np.iinfo(np.int64).min])))
+        # The top rate is 0.45, held to the 3 places of 0.325 as 450
+        self.assertEqual(table.income_range(per_dollar=1, max_units=45000)[1], 99)
+        with self.assertRaises(AssertionError):
+            table.tax_units_many(incomes)
+
+    def test_inexact_table(self) -> None:
+        table = self._load_table().adjusted_for_inflation(
+            self._load_inflation(), to_year=2024
+        )
+        fixed = table.fixed_point_table
+
+        self.assertFalse(fixed.exact)
+        self.assertFalse(fixed.whole_dollars)
+        self.assertEqual(
+            table.calculate_tax(
+                decimal.Decimal(1000), arithmetic=fixed_point.Arithmetic.FIXED_POINT
+            ),
+            table.calculate_tax(decimal.Decimal(1000)),
+        )
+        with self.assertRaises(AssertionError):
+            fixed.tax_units_many(np.array([1000]), per_dollar=1)
+        self.assertEqual(
+            table.calculate_tax_many(np.array([1000])).tolist(),
+            [float(table.calculate_tax(decimal.Decimal(1000)))],
+        )
+
+    def _load_table(self) -> tax.TaxTable:
+        table = """
+        {
+          "year": "2022-23",
+          "brackets": [
+            {
+              "min": "0",
+              "max": "100",
+              "rate": "0"
+            },
+            {
+              "min": "101",
+              "max": "300",
+              "rate": "0.30"
+            },
+            {
+              "min": "301",
+              "max": "500",
+              "rate": "0.325"
+            },
+            {
+              "min": "501",
+              "max": null,
+              "rate": "0.45"
+            }
+          ]
+        }
+        """
+        return tax._load_tax_table(json.loads(table))
+
+    def _load_inflation(self) -> inflation.Inflation:
+        data = """
+        [
+          {
+            "year": "2023-24",
+            "cpi": "0.0217"
+          },
+          {
+            "year": "2022-23",
+            "cpi": "0.0333"
+          }
+        ]
+        """
+        return inflation._load_inflation_from_content(
+            json.loads(data), inflation.InflationMeasure.CPI
+        )
+
+
+class FixedPointInflationTests(unittest.TestCase):
+
+    def test_adjust(self) -> None:
+        self._check_adjust(
+            amount="100", from_year=2022, to_year=2024, expected="105.06"
+        )
+
+    def test_adjust_rounds_once(self) -> None:
+        # 110.313 exactly
+        self._check_adjust(
+            amount="100", from_year=2021, to_year=2024, expected="110.31"
+        )
+
+    def test_adjust_half_even(self) -> None:
+        self._check_adjust(amount="0.10", from_year=2021, to_year=2022, expected="0.10")
+        self._check_adjust(amount="0.30", from_year=2021, to_year=2022, expected="0.32")
+
+    def test_adjust_to_current_year(self) -> None:
+        self._check_adjust(
+            amount="12.345", from_year=2024, to_year=2024, expected="12.34"
+        )
+
+    def test_adjust_backwards(self) -> None:
+        with self.assertRaises(AssertionError):
+            self._load_inflation().adjust(
+                decimal.Decimal(100),
+                from_year=2024,
+                to_year=2023,
+                arithmetic=fixed_point.Arithmetic.FIXED_POINT,
+            )
+
+    def test_price_index(self) -> None:
+        result = self._load_inflation().fixed_point_index
+
+        self.assertEqual(result.digits, 2)
+        self.assertEqual(
+            result.price_index,
+            {2021: 1, 2022: 105, 2023: 105 * 103, 2024: 105 * 103 * 102},
+        )
+
+    def _check_adjust(
+        self, amount: str, from_year: int, to_year: int, expected: str
+    ) -> None:
+        result = self._load_inflation().adjust(
+            decimal.Decimal(amount),
+            from_year=from_year,
+            to_year=to_year,
+            arithmetic=fixed_point.Arithmetic.FIXED_POINT,
+        )
+
+        self.assertEqual(result, decimal.Decimal(expected))
+        self.assertEqual(result.as_tuple().exponent, -2)
+
+    def _load_inflation(self) -> inflation.Inflation:
+        data = """
+        [
+          {
+            "year": "2023-24",
+            "cpi": "0.02"
+          },
+          {
+            "year": "2022-23",
+            "cpi": "0.03"
+          },
+          {
+            "year": "2021-22",
+            "cpi": "0.05"
+          }
+        ]
+        """
+        return inflation._load_inflation_from_content(
+            json.loads(data), inflation.InflationMeasure.CPI
+        )
+
+
+class VerifyTests(unittest.TestCase):
+
+    def test_verify_data(self) -> None:
+        tax_tables = tax.load_tax_tables(use_cache=False)
+        for measure in inflation.InflationMeasure:
+            with self.subTest(measure=measure):
+                result = fixed_point.verify(
+                    tax_tables,
+                    inflation.load_inflation(measure=measure, use_cache=False),
+                )
+
+                self.assertEqual(result, [])
+
+    def test_verify_rounded_rate(self) -> None:
+        table = """
+        [
+          {
+            "year": "2023-24",
+            "brackets": [
+              {
+                "min": "0",
+                "max": "100",
+                "rate": "0"
+              },
+              {
+                "min": "101",
+                "max": null,
+                "rate": "0.12345678"
+              }
+            ]
+          }
+        ]
+        """
+        tax_tables = tax._load_tax_tables_from_content(json.loads(table))
+
+        result = fixed_point.verify(tax_tables)
+
+        self.assertFalse(tax_tables.year_tables[0].fixed_point_table.exact)
+        self.assertEqual(
+            [m.description for m in result],
+            ["tax in 2023 on 101", "tax in 2023 on 102"],
+        )
+        self.assertEqual(result[0].expected, decimal.Decimal("0.12345678"))
+        self.assertEqual(result[0].actual, decimal.Decimal("0.12345700"))
@@ -0,0 +1,137 @@
+import decimal
+import importlib.util
+import json
+import math
+import unittest
+from analysis import inflation, tax
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class TaxTableFrameTests(unittest.TestCase):
+
+    def test_to_dataframe(self) -> None:
+        df = self._load_tables().to_dataframe()
+
+        self.assertEqual(list(df.columns), ["year", "fy", "start", "end", "rate"])
+        self.assertEqual(str(df["year"].dtype), "int64")
+        self.assertEqual(str(df["rate"].dtype), "float64")
+        self.assertEqual(df["year"].tolist(), [2024] * 2 + [2023] * 3)
+        self.assertEqual(df["fy"].tolist(), ["2024-25"] * 2 + ["2023-24"] * 3)
+        self.assertEqual(df["start"].tolist(), [0, 101, 0, 51, 201])
+        self.assertEqual(df["end"].tolist(), [100, math.inf, 50, 200, math.inf])
+        self.assertEqual(df["rate"].tolist(), [0, 0.3, 0, 0.2, 0.4])
+
+    def test_to_dataframe_copies(self) -> None:
+        tables = self._load_tables()
+        df = tables.to_dataframe()
+
+        df.loc[0, "start"] = 12345.0
+
+        self.assertEqual(tables.to_dataframe()["start"][0], 0)
+        self.assertEqual(tables.columns.columns.starts[0], 0)
+
+    def test_to_dataframe_exact(self) -> None:
+        df = self._load_tables().to_dataframe(exact=True)
+
+        self.assertEqual(df["fy"].tolist(), ["2024-25"] * 2 + ["2023-24"] * 3)
+        self.assertEqual(df["end"].tolist(), [100, None, 50, 200, None])
+        self.assertEqual(
+            df["rate"].tolist(),
+            [
+                0,
+                decimal.Decimal("0.3"),
+                0,
+                decimal.Decimal("0.2"),
+                decimal.Decimal("0.4"),
+            ],
+        )
+        self.assertIsInstance(df["start"][1], decimal.Decimal)
+
+    def test_to_dataframe_empty(self) -> None:
+        df = tax.MultiYearTaxTable(year_tables=[]).to_dataframe()
+
+        self.assertEqual(len(df), 0)
+        self.assertEqual(list(df.columns), ["year", "fy", "start", "end", "rate"])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow isn't installed")
+    def test_to_arrow(self) -> None:
+        result = self._load_tables().to_arrow()
+
+        self.assertEqual(result.column_names, ["year", "fy", "start", "end", "rate"])
+        self.assertEqual(result.column("end").to_pylist(), [100, None, 50, 200, None])
+        self.assertEqual(result.column("rate").to_pylist()[1], decimal.Decimal("0.3"))
+
+    @unittest.skipIf(HAS_PYARROW, "pyarrow is installed")
+    def test_to_arrow_without_pyarrow(self) -> None:
+        with self.assertRaises(ImportError):
+            self._load_tables().to_arrow()
+
+    def _load_tables(self) -> tax.MultiYearTaxTable:
+        tables = """
+        [
+          {
+            "year": "2024-25",
+            "brackets": [
+              {"min": "0", "max": "100", "rate": "0"},
+              {"min": "101", "max": null, "rate": "0.3"}
+            ]
+          },
+          {
+            "year": "2023-24",
+            "brackets": [
+              {"min": "0", "max": "50", "rate": "0"},
+              {"min": "51", "max": "200", "rate": "0.2"},
+              {"min": "201", "max": null, "rate": "0.4"}
+            ]
+          }
+        ]
+        """
+        return tax._load_tax_tables_from_content(json.loads(tables))
+
+
+class InflationFrameTests(unittest.TestCase):
+
+    def test_to_dataframe(self) -> None:
+        df = self._load_inflation().to_dataframe()
+
+        self.assertEqual(list(df.columns), ["year", "fy", "achange"])
+        self.assertEqual(str(df["achange"].dtype), "float64")
+        self.assertEqual(df["year"].tolist(), [2000, 1999])
+        self.assertEqual(df["fy"].tolist(), ["2000-01", "1999-2000"])
+        self.assertEqual(df["achange"].tolist(), [0.06, 0.032])
+
+    def test_to_dataframe_exact(self) -> None:
+        df = self._load_inflation().to_dataframe(exact=True)
+
+        self.assertEqual(
+            df["achange"].tolist(),
+            [decimal.Decimal("0.06"), decimal.Decimal("0.032")],
+        )
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow isn't installed")
+    def test_to_arrow(self) -> None:
+        result = self._load_inflation().to_arrow()
+
+        self.assertEqual(result.column("fy").to_pylist(), ["2000-01", "1999-2000"])
+        self.assertEqual(
+            result.column("achange").to_pylist(),
+            [decimal.Decimal("0.06"), decimal.Decimal("0.032")],
+        )
+
+    def _load_inflation(self) -> inflation.Inflation:
+        data = """
+        [
+          {
+            "year": "1999-2000",
+            "cpi": "0.032"
+          },
+          {
+            "year": "2000-01",
+            "cpi": "0.06"
+          }
+        ]
+        """
+        return inflation._load_inflation_from_content(
+            json.loads(data), inflation.InflationMeasure.CPI
+        )
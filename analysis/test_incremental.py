@@ -0,0 +1,226 @@
+import decimal
+import json
+import os
+import tempfile
+import typing
+import unittest
+from analysis import incremental, inflation, tax
+
+
+CPI = inflation.InflationMeasure.CPI
+
+
+class StoreTests(unittest.TestCase):
+
+    def test_get(self) -> None:
+        store = incremental.Store()
+        store.put(("a",), "1", "value")
+
+        self.assertEqual(store.get(("a",), "1"), "value")
+        self.assertIsNone(store.get(("a",), "2"))
+        self.assertIsNone(store.get(("b",), "1"))
+        self.assertEqual((store.hits, store.misses), (1, 2))
+
+    def test_save(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, "store.pickle")
+            store = incremental.Store(fname)
+            store.put(("a", 1), "1", [decimal.Decimal("0.5")])
+            store.save()
+
+            result = incremental.Store(fname)
+
+            self.assertEqual(result.get(("a", 1), "1"), [decimal.Decimal("0.5")])
+            self.assertEqual(os.listdir(tmp_dir), ["store.pickle"])
+
+    def test_missing_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = incremental.Store(os.path.join(tmp_dir, "store.pickle"))
+
+        self.assertEqual(len(result), 0)
+
+    def test_corrupt_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, "store.pickle")
+            with open(fname, "wb") as fh:
+                fh.write(b"not a pickle")
+
+            result = incremental.Store(fname)
+
+        self.assertEqual(len(result), 0)
+
+
+class PipelineTests(unittest.TestCase):
+
+    def test_adjusted_tables(self) -> None:
+        tax_tables = self._load_tax_tables()
+        inflate = self._load_inflation()
+        pipeline = incremental.Pipeline(incremental.Store())
+
+        result = pipeline.year_tables(tax_tables, {CPI: inflate}, CPI)
+
+        self.assertEqual(
+            [t.value for t in result],
+            tax_tables.adjusted_for_inflation(inflate).year_tables,
+        )
+        self.assertEqual(len(pipeline.computed), 2)
+
+    def test_reused(self) -> None:
+        store = incremental.Store()
+        self._adjust(store, self._load_tax_tables(), self._load_inflation())
+
+        pipeline = self._adjust(store, self._load_tax_tables(), self._load_inflation())
+
+        self.assertEqual(pipeline.computed, [])
+        self.assertEqual(len(pipeline.reused), 2)
+
+    def test_inflation_appended(self) -> None:
+        # The tables are adjusted to 2022, which the new year doesn't change
+        store = incremental.Store()
+        self._adjust(store, self._load_tax_tables(), self._load_inflation())
+
+        pipeline = self._adjust(
+            store, self._load_tax_tables(), self._load_inflation(appended=True)
+        )
+
+        self.assertEqual(pipeline.computed, [])
+
+    def test_inflation_revised(self) -> None:
+        store = incremental.Store()
+        self._adjust(store, self._load_tax_tables(), self._load_inflation())
+
+        pipeline = self._adjust(
+            store, self._load_tax_tables(), self._load_inflation(revised=True)
+        )
+
+        # Both tables are adjusted to 2022, whose index the 2021 revision changes
+        self.assertEqual(
+            pipeline.computed,
+            [
+                ("adjusted_table", "CPI", 2022, 2022),
+                ("adjusted_table", "CPI", 2021, 2022),
+            ],
+        )
+
+    def test_tax_table_appended(self) -> None:
+        store = incremental.Store()
+        inflations = {CPI: self._load_inflation(appended=True)}
+        before = incremental.Pipeline(store)
+        for m in [None, CPI]:
+            before.effective_rates(
+                before.year_tables(self._load_tax_tables(), inflations, m), 500, m
+            )
+
+        pipeline = incremental.Pipeline(store)
+        tax_tables = self._load_tax_tables(appended=True)
+        nominal = pipeline.effective_rates(
+            pipeline.year_tables(tax_tables, inflations, None), 500, None
+        )
+        adjusted = pipeline.year_tables(tax_tables, inflations, CPI)
+
+        # Nominal results only read their own year. Adjusted tables are now in 2023
+        # dollars, so every one changes.
+        self.assertEqual(
+            pipeline.computed,
+            [
+                ("effective_rate", "nominal", 2023, 500),
+                ("adjusted_table", "CPI", 2023, 2023),
+                ("adjusted_table", "CPI", 2022, 2023),
+                ("adjusted_table", "CPI", 2021, 2023),
+            ],
+        )
+        self.assertEqual([r.year for r in nominal.value], [2021, 2022, 2023])
+        self.assertEqual(adjusted[1].value.brackets[0].end, decimal.Decimal(102))
+
+    def test_effective_rates(self) -> None:
+        pipeline = incremental.Pipeline(incremental.Store())
+        tables = pipeline.year_tables(self._load_tax_tables(), {}, None)
+
+        result = pipeline.effective_rates(tables, 500, None)
+
+        self.assertEqual(
+            result.value,
+            [
+                incremental.EffectiveRate(
+                    year=2021,
+                    tax=decimal.Decimal("120.0"),
+                    rate=decimal.Decimal("0.24"),
+                ),
+                incremental.EffectiveRate(
+                    year=2022,
+                    tax=decimal.Decimal("150.0"),
+                    rate=decimal.Decimal("0.3"),
+                ),
+            ],
+        )
+
+    def test_effective_rates_fingerprint(self) -> None:
+        pipeline = incremental.Pipeline(incremental.Store())
+        tables = pipeline.year_tables(self._load_tax_tables(), {}, None)
+
+        result = pipeline.effective_rates(tables, 500, None)
+
+        self.assertEqual(
+            result.fingerprint,
+            pipeline.effective_rates(tables, 500, None).fingerprint,
+        )
+        self.assertNotEqual(
+            result.fingerprint,
+            pipeline.effective_rates(tables, 600, None).fingerprint,
+        )
+
+    def test_combine(self) -> None:
+        pipeline = incremental.Pipeline(incremental.Store())
+        tax_tables = self._load_tax_tables()
+
+        result = incremental.combine(pipeline.year_tables(tax_tables, {}, None))
+
+        self.assertEqual(result.value, tax_tables)
+        self.assertEqual(
+            result.fingerprint,
+            incremental.combine(
+                pipeline.year_tables(self._load_tax_tables(), {}, None)
+            ).fingerprint,
+        )
+
+    def _adjust(
+        self,
+        store: incremental.Store,
+        tax_tables: tax.MultiYearTaxTable,
+        inflate: inflation.Inflation,
+    ) -> incremental.Pipeline:
+        pipeline = incremental.Pipeline(store)
+        pipeline.year_tables(tax_tables, {CPI: inflate}, CPI)
+        return pipeline
+
+    def _load_tax_tables(self, appended: bool = False) -> tax.MultiYearTaxTable:
+        tables: list[dict[str, typing.Any]] = [
+            {
+                "year": "2022-23",
+                "brackets": [
+                    {"min": "0", "max": "100", "rate": "0"},
+                    {"min": "101", "max": None, "rate": "0.375"},
+                ],
+            },
+            {
+                "year": "2021-22",
+                "brackets": [
+                    {"min": "0", "max": "200", "rate": "0"},
+                    {"min": "201", "max": None, "rate": "0.4"},
+                ],
+            },
+        ]
+        if appended:
+            tables.insert(0, {**tables[0], "year": "2023-24"})
+        return tax._load_tax_tables_from_content(json.loads(json.dumps(tables)))
+
+    def _load_inflation(
+        self, appended: bool = False, revised: bool = False
+    ) -> inflation.Inflation:
+        data = [
+            {"year": "2022-23", "cpi": "0.02"},
+            {"year": "2021-22", "cpi": "0.05" if revised else "0.03"},
+        ]
+        if appended:
+            data.insert(0, {"year": "2023-24", "cpi": "0.04"})
+        return inflation._load_inflation_from_content(data, CPI)
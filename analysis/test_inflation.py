@@ -1,5 +1,6 @@
 import decimal
 import json
+import pickle
 import unittest
 from analysis import inflation
 
@@ -15,6 +16,22 @@ class InflationTests(unittest.TestCase):
     def test_adjust_to_earlier_year(self) -> None:
         self._check_adjust(amount=100, from_year=2021, to_year=2023, expected="108.15")
 
+    def test_adjust_across_all_years(self) -> None:
+        self._check_adjust(amount=100, from_year=2021, to_year=2024, expected="110.313")
+
+    def test_price_index(self) -> None:
+        inflate = self._load_inflation()
+
+        self.assertEqual(
+            [inflate.price_index(y) for y in range(2021, 2025)],
+            [
+                decimal.Decimal(1),
+                decimal.Decimal("1.05"),
+                decimal.Decimal("1.0815"),
+                decimal.Decimal("1.10313"),
+            ],
+        )
+
     def test_adjust_backwards(self) -> None:
         with self.assertRaises(AssertionError):
             self._adjust(amount=100, from_year=2024, to_year=2023)
@@ -27,6 +44,23 @@ class InflationTests(unittest.TestCase):
         with self.assertRaises(AssertionError):
             self._adjust(amount=100, from_year=2022, to_year=2026)
 
+    def test_years_slots(self) -> None:
+        result = self._load_inflation().years[0]
+
+        self.assertFalse(hasattr(result, "__dict__"))
+        self.assertEqual(
+            result, inflation.InflationYear(year=2023, achange=decimal.Decimal("0.02"))
+        )
+        self.assertEqual(
+            hash(result),
+            hash(inflation.InflationYear(year=2023, achange=decimal.Decimal("0.02"))),
+        )
+
+    def test_years_pickle(self) -> None:
+        years = self._load_inflation().years
+
+        self.assertEqual(pickle.loads(pickle.dumps(years)), years)
+
     def _check_adjust(
         self, amount: int, from_year: int, to_year: int, expected: str
     ) -> None:
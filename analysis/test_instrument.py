@@ -0,0 +1,196 @@
+import decimal
+import json
+import logging
+import os
+import tempfile
+import unittest
+from analysis import instrument, tax
+
+
+class InstrumentTests(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        instrument.disable()
+
+    def test_disabled(self) -> None:
+        self._load_table().calculate_tax(decimal.Decimal(200))
+
+        self.assertFalse(instrument.enabled())
+        self.assertEqual(instrument.snapshot(), instrument.Snapshot({}, {}))
+        self.assertFalse(hasattr(tax.TaxTable.calculate_tax, "__wrapped__"))
+
+    def test_timed_method(self) -> None:
+        table = self._load_table()
+        instrument.enable()
+
+        table.calculate_tax(decimal.Decimal(200))
+        table.calculate_tax(decimal.Decimal(400))
+
+        result = instrument.snapshot().timers["tax.calculate_tax"]
+        self.assertEqual(result.count, 2)
+        self.assertGreater(result.total, 0)
+        self.assertLessEqual(result.min, result.max)
+        self.assertAlmostEqual(result.mean, result.total / 2)
+
+    def test_timed_function(self) -> None:
+        instrument.enable()
+
+        tax.load_tax_tables()
+
+        self.assertEqual(instrument.snapshot().timers["tax.load_tax_tables"].count, 1)
+
+    def test_disable_restores(self) -> None:
+        original = tax.TaxTable.calculate_tax
+        instrument.enable()
+        self.assertIsNot(tax.TaxTable.calculate_tax, original)
+
+        instrument.disable()
+
+        self.assertIs(tax.TaxTable.calculate_tax, original)
+
+    def test_timed_raises(self) -> None:
+        instrument.enable()
+
+        with self.assertRaises(AssertionError):
+            tax._load_tax_table({"year": "2022-23", "brackets": []})
+
+        self.assertEqual(instrument.snapshot().timers["tax.parse_tax_table"].count, 1)
+
+    def test_timed_local_function(self) -> None:
+        with self.assertRaises(AssertionError):
+
+            @instrument.timed("local")
+            def local() -> None:
+                pass
+
+    def test_count(self) -> None:
+        instrument.enable()
+
+        self._load_table()
+        self._load_table()
+
+        self.assertEqual(instrument.snapshot().counters, {"tax.brackets_parsed": 6})
+
+    def test_timer(self) -> None:
+        instrument.enable()
+
+        with instrument.timer("block"):
+            pass
+
+        self.assertEqual(instrument.snapshot().timers["block"].count, 1)
+
+    def test_timer_disabled(self) -> None:
+        with instrument.timer("block"):
+            pass
+
+        self.assertEqual(instrument.snapshot().timers, {})
+
+    def test_flush(self) -> None:
+        written: list[instrument.Snapshot] = []
+
+        class ListSink:
+            def write(self, snapshot: instrument.Snapshot) -> None:
+                written.append(snapshot)
+
+        instrument.enable([ListSink()])
+        instrument.count("a", 3)
+        instrument.flush()
+
+        self.assertEqual(written, [instrument.Snapshot(timers={}, counters={"a": 3})])
+
+    def _load_table(self) -> tax.TaxTable:
+        table = """
+        {
+          "year": "2022-23",
+          "brackets": [
+            {
+              "min": "0",
+              "max": "100",
+              "rate": "0"
+            },
+            {
+              "min": "101",
+              "max": "300",
+              "rate": "0.30"
+            },
+            {
+              "min": "301",
+              "max": null,
+              "rate": "0.45"
+            }
+          ]
+        }
+        """
+        return tax._load_tax_table(json.loads(table))
+
+
+class SinkTests(unittest.TestCase):
+
+    def test_log(self) -> None:
+        sink = instrument.LogSink(logging.getLogger("test_instrument"))
+
+        with self.assertLogs("test_instrument", logging.INFO) as logs:
+            sink.write(self._snapshot())
+
+        self.assertEqual(
+            [r.getMessage() for r in logs.records],
+            [
+                "tax.calculate_tax: 4 calls, 0.010 ms total, 2.5 us mean, 4.0 us max",
+                "tax.brackets_parsed: 1,024",
+            ],
+        )
+
+    def test_json(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, "metrics.json")
+
+            instrument.JsonSink(fname).write(self._snapshot())
+
+            with open(fname, "r") as fh:
+                result = json.load(fh)
+            self.assertEqual(os.listdir(tmp_dir), ["metrics.json"])
+
+        self.assertEqual(
+            result,
+            {
+                "timers": {
+                    "tax.calculate_tax": {
+                        "count": 4,
+                        "total": 1e-05,
+                        "min": 1e-06,
+                        "max": 4e-06,
+                    }
+                },
+                "counters": {"tax.brackets_parsed": 1024},
+            },
+        )
+
+    def test_prometheus(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, "metrics.prom")
+
+            instrument.PrometheusSink(fname).write(self._snapshot())
+
+            with open(fname, "r") as fh:
+                result = fh.read()
+
+        self.assertEqual(
+            result,
+            "# TYPE analysis_tax_calculate_tax_seconds summary\n"
+            "analysis_tax_calculate_tax_seconds_sum 1e-05\n"
+            "analysis_tax_calculate_tax_seconds_count 4\n"
+            "# TYPE analysis_tax_calculate_tax_seconds_max gauge\n"
+            "analysis_tax_calculate_tax_seconds_max 4e-06\n"
+            "# TYPE analysis_tax_brackets_parsed_total counter\n"
+            "analysis_tax_brackets_parsed_total 1024\n",
+        )
+
+    def _snapshot(self) -> instrument.Snapshot:
+        return instrument.Snapshot(
+            timers={
+                "tax.calculate_tax": instrument.TimerStats(
+                    count=4, total=1e-5, min=1e-6, max=4e-6
+                )
+            },
+            counters={"tax.brackets_parsed": 1024},
+        )
@@ -0,0 +1,25 @@
+import numpy as np
+import unittest
+from analysis import labels
+
+
+class FinancialYearsTests(unittest.TestCase):
+
+    def test_matches_financial_year(self) -> None:
+        years = np.arange(1990, 2101)
+
+        result = labels.financial_years(years)
+
+        self.assertEqual(
+            result.tolist(), [labels.financial_year(int(y)) for y in years]
+        )
+
+    def test_millenium(self) -> None:
+        result = labels.financial_years(np.array([1998, 1999, 2000]))
+
+        self.assertEqual(result.tolist(), ["1998-99", "1999-2000", "2000-01"])
+
+    def test_empty(self) -> None:
+        result = labels.financial_years(np.array([], dtype=np.int64))
+
+        self.assertEqual(result.tolist(), [])
@@ -0,0 +1,64 @@
+import unittest
+from analysis import memo
+
+
+class LruCacheTests(unittest.TestCase):
+
+    def test_computes_on_miss(self) -> None:
+        cache: memo.LruCache[str, int] = memo.LruCache(maxsize=2)
+
+        result = cache.get_or_compute("a", lambda: 1)
+
+        self.assertEqual(result, 1)
+        self.assertEqual(cache.info(), memo.CacheInfo(0, 1, 2, 1))
+
+    def test_reuses_on_hit(self) -> None:
+        cache: memo.LruCache[str, int] = memo.LruCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+
+        result = cache.get_or_compute("a", lambda: 2)
+
+        self.assertEqual(result, 1)
+        self.assertEqual(cache.info(), memo.CacheInfo(1, 1, 2, 1))
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache: memo.LruCache[str, int] = memo.LruCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("c", lambda: 3)
+
+        result = cache.get_or_compute("b", lambda: 4)
+
+        self.assertEqual(result, 4)
+        self.assertEqual(cache.get_or_compute("a", lambda: 5), 5)
+
+    def test_resize(self) -> None:
+        cache: memo.LruCache[str, int] = memo.LruCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+
+        cache.resize(1)
+
+        self.assertEqual(cache.info().currsize, 1)
+        self.assertEqual(cache.get_or_compute("b", lambda: 3), 2)
+
+    def test_clear(self) -> None:
+        cache: memo.LruCache[str, int] = memo.LruCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+
+        cache.clear()
+
+        self.assertEqual(cache.info(), memo.CacheInfo(0, 0, 2, 0))
+
+
+class IdentityTests(unittest.TestCase):
+
+    def test_same_object(self) -> None:
+        value: list[int] = []
+
+        self.assertEqual(memo.Identity(value), memo.Identity(value))
+        self.assertEqual(hash(memo.Identity(value)), hash(memo.Identity(value)))
+
+    def test_equal_objects(self) -> None:
+        self.assertNotEqual(memo.Identity([1]), memo.Identity([1]))
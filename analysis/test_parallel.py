@@ -0,0 +1,62 @@
+import json
+import numpy as np
+import unittest
+from analysis import parallel, tax
+
+
+class EvaluateTests(unittest.TestCase):
+
+    def test_serial(self) -> None:
+        tables = self._load_tables()
+        incomes = parallel.income_grid(0, 1000, 3)
+
+        result = parallel.evaluate(tables, incomes, workers=1)
+
+        self._check(tables, incomes, result)
+
+    def test_parallel(self) -> None:
+        tables = self._load_tables()
+        incomes = parallel.income_grid(0, 1000, 3)
+
+        result = parallel.evaluate(tables, incomes, workers=2, chunk_size=50)
+
+        self._check(tables, incomes, result)
+
+    def test_uneven_chunks(self) -> None:
+        tables = self._load_tables()
+        incomes = np.array([1000, 5, 250, 99, 100, 101], dtype=np.int64)
+
+        result = parallel.evaluate(tables, incomes, workers=2, chunk_size=4)
+
+        self._check(tables, incomes, result)
+
+    def _check(
+        self,
+        tables: tax.MultiYearTaxTable,
+        incomes: np.typing.NDArray[np.int64],
+        result: np.typing.NDArray[np.float64],
+    ) -> None:
+        self.assertEqual(result.shape, (2, len(incomes)))
+        for row, table in zip(result, tables.year_tables):
+            self.assertEqual(row.tolist(), table.calculate_tax_many(incomes).tolist())
+
+    def _load_tables(self) -> tax.MultiYearTaxTable:
+        tables = """
+        [
+          {
+            "year": "2024-25",
+            "brackets": [
+              {"min": "0", "max": "99", "rate": "0"},
+              {"min": "100", "max": null, "rate": "0.4"}
+            ]
+          },
+          {
+            "year": "2023-24",
+            "brackets": [
+              {"min": "0", "max": "199", "rate": "0"},
+              {"min": "200", "max": null, "rate": "0.325"}
+            ]
+          }
+        ]
+        """
+        return tax._load_tax_tables_from_content(json.loads(tables))
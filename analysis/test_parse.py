@@ -1,3 +1,4 @@
+import decimal
 import unittest
 from analysis import parse
 
@@ -37,3 +38,24 @@ class ParseFinancialYearTests(unittest.TestCase):
     def test_parse_financial_year_not_numeric(self) -> None:
         with self.assertRaises(AssertionError):
             parse.parse_financial_year("year-ab")
+
+
+class ParseDecimalTests(unittest.TestCase):
+
+    def test_parse_decimal(self) -> None:
+        result = parse.parse_decimal("0.325")
+
+        self.assertEqual(result, decimal.Decimal("0.325"))
+
+    def test_parse_decimal_shared(self) -> None:
+        self.assertIs(parse.parse_decimal("0.19"), parse.parse_decimal("0.19"))
+
+    def test_parse_decimal_keeps_exponent(self) -> None:
+        result = parse.parse_decimal("0.30")
+
+        self.assertEqual(str(result), "0.30")
+        self.assertEqual(str(parse.parse_decimal("0.3")), "0.3")
+
+    def test_parse_decimal_invalid(self) -> None:
+        with self.assertRaises(decimal.InvalidOperation):
+            parse.parse_decimal("abc")
@@ -0,0 +1,123 @@
+import json
+import numpy as np
+import os
+import tempfile
+import typing
+import unittest
+from analysis import population, tax
+
+
+class SimulateTests(unittest.TestCase):
+
+    def test_totals(self) -> None:
+        result = population.simulate(self._load_tables(), self._source())
+
+        self.assertEqual([s.year for s in result], [2024, 2023])
+        self.assertEqual(result[0].taxpayers, 24)
+        self.assertEqual(result[0].total_income, 13000)
+        self.assertAlmostEqual(result[0].revenue, 2565.6)
+        self.assertAlmostEqual(result[1].revenue, 0.8 * 10 + 240.8 * 10 + 1520.8 * 4)
+        self.assertAlmostEqual(result[1].average_rate, result[1].revenue / 13000)
+        self.assertAlmostEqual(result[0].average_marginal_rate, 0.4 * 14 / 24)
+
+    def test_deciles(self) -> None:
+        incomes = np.arange(100, 1100, 100, dtype=np.int64)
+
+        result = population.simulate(
+            self._load_tables(), self._chunked(incomes, 4), bin_width=1
+        )[0]
+
+        self.assertEqual([d.taxpayers for d in result.deciles], [1] * 10)
+        self.assertEqual(result.deciles[0].lower, 0)
+        self.assertEqual(result.deciles[0].upper, 101)
+        self.assertEqual(result.deciles[-1].lower, 901)
+        self.assertEqual(result.deciles[-1].upper, float("inf"))
+        self.assertEqual(result.deciles[2].revenue, 0)
+        self.assertAlmostEqual(result.deciles[3].revenue, 0.4)
+        self.assertAlmostEqual(result.deciles[4].revenue, 40.4)
+        self.assertAlmostEqual(result.deciles[-1].revenue, 240.4)
+        self.assertAlmostEqual(result.deciles[-1].average_rate, 0.2404)
+        self.assertAlmostEqual(sum(d.revenue for d in result.deciles), result.revenue)
+
+    def test_chunking(self) -> None:
+        incomes = np.array([0, 50, 150, 300, 2000] * 10, dtype=np.int64)
+
+        whole = population.simulate(self._load_tables(), self._chunked(incomes, 50))
+        chunked = population.simulate(self._load_tables(), self._chunked(incomes, 7))
+
+        for w, c in zip(whole, chunked):
+            self.assertEqual(w.taxpayers, c.taxpayers)
+            self.assertAlmostEqual(w.revenue, c.revenue)
+            self.assertEqual([d.upper for d in w.deciles], [d.upper for d in c.deciles])
+
+    def test_csv_source(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            fname = os.path.join(d, "incomes.csv")
+            with open(fname, "w") as fh:
+                fh.write("income,weight\n100,10\n400,10\n2000,4\n")
+
+            result = population.simulate(
+                self._load_tables(), population.file_incomes(fname, chunk_size=2)
+            )
+
+        self.assertEqual(result[0].taxpayers, 24)
+        self.assertAlmostEqual(result[0].revenue, 2565.6)
+
+    def test_npy_source(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            fname = os.path.join(d, "incomes.npy")
+            np.save(fname, np.array([[100, 10], [400, 10], [2000, 4]]))
+
+            result = population.simulate(
+                self._load_tables(), population.file_incomes(fname, chunk_size=2)
+            )
+
+        self.assertEqual(result[0].taxpayers, 24)
+        self.assertAlmostEqual(result[0].revenue, 2565.6)
+
+    def test_synthetic_source_repeatable(self) -> None:
+        source = population.synthetic_incomes(size=1000, chunk_size=300)
+
+        first = np.concatenate([i for i, _ in source()])
+        second = np.concatenate([i for i, _ in source()])
+
+        self.assertEqual(first.tolist(), second.tolist())
+        self.assertEqual(len(first), 1000)
+
+    def _source(self) -> population.Source:
+        def chunks() -> typing.Iterator[population.Chunk]:
+            yield np.array([100, 400]), np.array([10.0, 10.0])
+            yield np.array([2000]), np.array([4.0])
+
+        return chunks
+
+    def _chunked(
+        self, incomes: np.typing.NDArray[np.int64], chunk_size: int
+    ) -> population.Source:
+        def chunks() -> typing.Iterator[population.Chunk]:
+            for i in range(0, len(incomes), chunk_size):
+                chunk = incomes[i : i + chunk_size]
+                yield chunk, np.ones(len(chunk))
+
+        return chunks
+
+    def _load_tables(self) -> tax.MultiYearTaxTable:
+        tables = """
+        [
+          {
+            "year": "2024-25",
+            "brackets": [
+              {"min": "0", "max": "399", "rate": "0"},
+              {"min": "400", "max": null, "rate": "0.4"}
+            ]
+          },
+          {
+            "year": "2023-24",
+            "brackets": [
+              {"min": "0", "max": "99", "rate": "0"},
+              {"min": "100", "max": null, "rate": "0.8"}
+            ]
+          }
+        ]
+        """
+        return tax._load_tax_tables_from_content(json.loads(tables))
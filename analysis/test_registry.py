@@ -0,0 +1,128 @@
+import decimal
+import json
+import os
+import tempfile
+import typing
+import unittest
+from analysis import inflation, registry
+
+
+class RegistryTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._fname = os.path.join(self._dir.name, "data.json")
+        self._compiled = 0
+        self._write([1, 2, 3])
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def test_memoizes(self) -> None:
+        reg = registry.Registry()
+        first = self._load(reg)
+
+        second = self._load(reg)
+
+        self.assertIs(first, second)
+        self.assertEqual(self._compiled, 1)
+
+    def test_ignores_changes_without_watch(self) -> None:
+        reg = registry.Registry()
+        self._load(reg)
+        self._write([1, 2, 3, 4])
+
+        result = self._load(reg)
+
+        self.assertEqual(result, [1, 2, 3])
+
+    def test_reloads_changes_with_watch(self) -> None:
+        reg = registry.Registry(watch=True)
+        self._load(reg)
+        self._write([1, 2, 3, 4])
+
+        result = self._load(reg)
+
+        self.assertEqual(result, [1, 2, 3, 4])
+
+    def test_watch_per_load(self) -> None:
+        reg = registry.Registry()
+        self._load(reg)
+        self._write([1, 2, 3, 4])
+
+        result = reg.load(self._fname, "content", self._compile, watch=True)
+
+        self.assertEqual(result, [1, 2, 3, 4])
+
+    def test_invalidate(self) -> None:
+        reg = registry.Registry()
+        self._load(reg)
+        self._write([1, 2, 3, 4])
+
+        reg.invalidate(self._fname)
+        result = self._load(reg)
+
+        self.assertEqual(result, [1, 2, 3, 4])
+
+    def test_invalidate_other_file(self) -> None:
+        reg = registry.Registry()
+        first = self._load(reg)
+
+        reg.invalidate(os.path.join(self._dir.name, "other.json"))
+        second = self._load(reg)
+
+        self.assertIs(first, second)
+
+    def test_invalidate_all(self) -> None:
+        reg = registry.Registry()
+        first = self._load(reg)
+
+        reg.invalidate()
+        second = self._load(reg)
+
+        self.assertIsNot(first, second)
+
+    def test_on_invalidate(self) -> None:
+        reg = registry.Registry()
+        calls: list[None] = []
+        reg.on_invalidate(lambda: calls.append(None))
+
+        reg.invalidate(self._fname)
+        reg.invalidate()
+
+        self.assertEqual(len(calls), 2)
+
+    def test_inflation_measures_share_parse(self) -> None:
+        self._write(
+            [
+                {"year": "2023-24", "cpi": "0.02", "wpi": "0.03"},
+                {"year": "2022-23", "cpi": "0.04", "wpi": "0.05"},
+            ]
+        )
+        registry.invalidate(self._fname)
+
+        cpi = inflation.load_inflation(self._fname, inflation.InflationMeasure.CPI)
+        wpi = inflation.load_inflation(self._fname, inflation.InflationMeasure.WPI)
+
+        self.assertEqual(cpi.years[0].achange, decimal.Decimal("0.02"))
+        self.assertEqual(wpi.years[0].achange, decimal.Decimal("0.03"))
+        self.assertIs(
+            cpi, inflation.load_inflation(self._fname, inflation.InflationMeasure.CPI)
+        )
+        registry.invalidate(self._fname)
+
+    def _load(self, reg: registry.Registry) -> typing.Any:
+        return reg.load(self._fname, "content", self._compile)
+
+    def _compile(self, content: typing.Any) -> typing.Any:
+        self._compiled += 1
+        return content
+
+    def _write(self, content: typing.Any) -> None:
+        mtime_ns = (
+            os.stat(self._fname).st_mtime_ns if os.path.exists(self._fname) else 0
+        )
+        with open(self._fname, "w") as fh:
+            json.dump(content, fh)
+        if os.stat(self._fname).st_mtime_ns == mtime_ns:
+            os.utime(self._fname, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
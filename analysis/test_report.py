@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+from analysis import incremental, registry, report
+
+
+class RenderTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._out_dir = os.path.join(self._dir.name, "out")
+        self._tax_fname = os.path.join(self._dir.name, "tax.json")
+        self._inflation_fname = os.path.join(self._dir.name, "inflation.json")
+        with open(self._tax_fname, "w") as fh:
+            json.dump(
+                [
+                    {
+                        "year": "2023-24",
+                        "brackets": [
+                            {"min": "0", "max": "100", "rate": "0"},
+                            {"min": "101", "max": None, "rate": "0.3"},
+                        ],
+                    },
+                    {
+                        "year": "2022-23",
+                        "brackets": [
+                            {"min": "0", "max": "50", "rate": "0"},
+                            {"min": "51", "max": None, "rate": "0.2"},
+                        ],
+                    },
+                ],
+                fh,
+            )
+        with open(self._inflation_fname, "w") as fh:
+            json.dump(
+                [
+                    {"year": "2023-24", "cpi": "0.02", "wpi": "0.04"},
+                    {"year": "2022-23", "cpi": "0.03", "wpi": "0.03"},
+                ],
+                fh,
+            )
+
+    def tearDown(self) -> None:
+        registry.invalidate()
+        self._dir.cleanup()
+
+    def test_charts(self) -> None:
+        result = report.charts([100, 200])
+
+        self.assertEqual(
+            [c.name for c in result],
+            [
+                "tax_rates_over_time_nominal",
+                "tax_rates_over_time_cpi",
+                "tax_rates_over_time_wpi",
+                "inflation_over_time",
+                "effective_tax_over_time_100_nominal",
+                "effective_tax_over_time_100_cpi",
+                "effective_tax_over_time_100_wpi",
+                "effective_tax_over_time_200_nominal",
+                "effective_tax_over_time_200_cpi",
+                "effective_tax_over_time_200_wpi",
+            ],
+        )
+
+    def test_render(self) -> None:
+        charts = report.charts([100])
+
+        result = report.render(
+            self._out_dir,
+            charts,
+            formats=["png", "svg"],
+            workers=1,
+            tax_fname=self._tax_fname,
+            inflation_fname=self._inflation_fname,
+        )
+
+        self.assertEqual(
+            result,
+            [
+                os.path.join(self._out_dir, f"{c.name}.{fmt}")
+                for c in charts
+                for fmt in ["png", "svg"]
+            ],
+        )
+        self.assertEqual(
+            sorted(os.listdir(self._out_dir)), sorted(map(os.path.basename, result))
+        )
+        for fname in result:
+            self.assertGreater(os.path.getsize(fname), 0)
+
+    def test_render_store(self) -> None:
+        charts = report.charts([100])
+        store = incremental.Store()
+
+        def rendered() -> list[str]:
+            # The names of the charts drawn by a render with the store
+            with unittest.mock.patch.object(
+                report, "_render_chart", wraps=report._render_chart
+            ) as render_chart:
+                report.render(
+                    self._out_dir,
+                    charts,
+                    formats=["png"],
+                    workers=1,
+                    store=store,
+                    tax_fname=self._tax_fname,
+                    inflation_fname=self._inflation_fname,
+                )
+            return [c.args[0][0].name for c in render_chart.call_args_list]
+
+        self.assertEqual(rendered(), [c.name for c in charts])
+        self.assertEqual(rendered(), [])
+
+        with open(self._inflation_fname) as fh:
+            years = json.load(fh)
+        # The tables are adjusted to 2023, which the new year doesn't change
+        years.insert(0, {"year": "2024-25", "cpi": "0.04", "wpi": "0.02"})
+        with open(self._inflation_fname, "w") as fh:
+            json.dump(years, fh)
+        registry.invalidate()
+        self.assertEqual(rendered(), ["inflation_over_time"])
+
+        os.remove(os.path.join(self._out_dir, "tax_rates_over_time_cpi.png"))
+        self.assertEqual(rendered(), ["tax_rates_over_time_cpi"])
@@ -0,0 +1,258 @@
+import decimal
+import json
+import numpy as np
+import unittest
+import unittest.mock
+from analysis import inflation, scenario, tax
+
+
+class ScenarioTests(unittest.TestCase):
+
+    def test_with_rate(self) -> None:
+        table = self._load_table()
+
+        result = scenario.with_rate(table, 1, decimal.Decimal("0.25"))
+
+        self.assertEqual(result.year, 2022)
+        self.assertEqual(
+            result.brackets[1],
+            tax.TaxBracket(
+                start=decimal.Decimal(101),
+                end=decimal.Decimal(300),
+                rate=decimal.Decimal("0.25"),
+            ),
+        )
+        self.assertEqual(result.calculate_tax(decimal.Decimal(200)), 25)
+        # The source is unchanged, and shares every other bracket
+        self.assertEqual(table.brackets[1].rate, decimal.Decimal("0.3"))
+        self.assertIs(result.brackets[0], table.brackets[0])
+        self.assertIs(result.brackets[2], table.brackets[2])
+
+    def test_with_rate_invalid(self) -> None:
+        with self.assertRaises(AssertionError):
+            scenario.with_rate(self._load_table(), 1, decimal.Decimal("1.5"))
+
+    def test_with_threshold(self) -> None:
+        table = self._load_table()
+
+        result = scenario.with_threshold(table, 2, decimal.Decimal(401))
+
+        self.assertEqual(
+            [(b.start, b.end) for b in result.brackets],
+            [(0, 100), (101, 400), (401, None)],
+        )
+        self.assertIs(result.brackets[0], table.brackets[0])
+
+    def test_with_threshold_past_next(self) -> None:
+        with self.assertRaises(AssertionError):
+            scenario.with_threshold(self._load_table(), 1, decimal.Decimal(301))
+
+    def test_with_threshold_first(self) -> None:
+        with self.assertRaises(AssertionError):
+            scenario.with_threshold(self._load_table(), 0, decimal.Decimal(10))
+
+    def test_with_bracket(self) -> None:
+        table = self._load_table()
+
+        result = scenario.with_bracket(
+            table, decimal.Decimal(1001), decimal.Decimal("0.6")
+        )
+
+        self.assertEqual(
+            [(b.start, b.end, b.rate) for b in result.brackets],
+            [
+                (0, 100, 0),
+                (101, 300, decimal.Decimal("0.3")),
+                (301, 1000, decimal.Decimal("0.45")),
+                (1001, None, decimal.Decimal("0.6")),
+            ],
+        )
+        self.assertIs(result.brackets[1], table.brackets[1])
+
+    def test_with_bracket_splits_middle(self) -> None:
+        result = scenario.with_bracket(
+            self._load_table(), decimal.Decimal(201), decimal.Decimal("0.35")
+        )
+
+        self.assertEqual(
+            [(b.start, b.end, b.rate) for b in result.brackets[1:3]],
+            [
+                (101, 200, decimal.Decimal("0.3")),
+                (201, 300, decimal.Decimal("0.35")),
+            ],
+        )
+
+    def test_with_bracket_existing_start(self) -> None:
+        with self.assertRaises(AssertionError):
+            scenario.with_bracket(
+                self._load_table(), decimal.Decimal(101), decimal.Decimal("0.35")
+            )
+
+    def test_with_bracket_too_narrow(self) -> None:
+        with self.assertRaises(AssertionError):
+            scenario.with_bracket(
+                self._load_table(), decimal.Decimal(102), decimal.Decimal("0.35")
+            )
+
+    def test_without_bracket(self) -> None:
+        result = scenario.without_bracket(self._load_table(), 1)
+
+        self.assertEqual(
+            [(b.start, b.end, b.rate) for b in result.brackets],
+            [(0, 300, 0), (301, None, decimal.Decimal("0.45"))],
+        )
+
+    def test_without_first_bracket(self) -> None:
+        result = scenario.without_bracket(self._load_table(), 0)
+
+        self.assertEqual(
+            [(b.start, b.end, b.rate) for b in result.brackets],
+            [(0, 300, decimal.Decimal("0.3")), (301, None, decimal.Decimal("0.45"))],
+        )
+
+    def test_without_last_bracket(self) -> None:
+        result = scenario.without_bracket(self._load_table(), 2)
+
+        self.assertEqual(
+            [(b.start, b.end, b.rate) for b in result.brackets],
+            [(0, 100, 0), (101, None, decimal.Decimal("0.3"))],
+        )
+
+    def test_without_only_bracket(self) -> None:
+        table = scenario.without_bracket(
+            scenario.without_bracket(self._load_table(), 2), 1
+        )
+
+        with self.assertRaises(AssertionError):
+            scenario.without_bracket(table, 0)
+
+    def test_chained(self) -> None:
+        table = self._load_table()
+
+        result = scenario.with_rate(
+            scenario.with_bracket(table, decimal.Decimal(1001), decimal.Decimal("0.5")),
+            0,
+            decimal.Decimal("0.1"),
+        )
+
+        # 101 * 0.1 + 200 * 0.3 + 700 * 0.45 + 1 * 0.5
+        self.assertEqual(
+            result.calculate_tax(decimal.Decimal(1001)), decimal.Decimal("385.6")
+        )
+        self.assertEqual(len(table.brackets), 3)
+
+    def _load_table(self) -> tax.TaxTable:
+        table = """
+        {
+          "year": "2022-23",
+          "brackets": [
+            {
+              "min": "0",
+              "max": "100",
+              "rate": "0"
+            },
+            {
+              "min": "101",
+              "max": "300",
+              "rate": "0.30"
+            },
+            {
+              "min": "301",
+              "max": null,
+              "rate": "0.45"
+            }
+          ]
+        }
+        """
+        return tax._load_tax_table(json.loads(table))
+
+
+class CalculateTaxManyTests(unittest.TestCase):
+
+    def test_matches_each_table(self) -> None:
+        table = self._load_table()
+        tables = [
+            table,
+            scenario.with_rate(table, 1, decimal.Decimal("0.2")),
+            scenario.with_threshold(table, 2, decimal.Decimal(251)),
+            scenario.with_bracket(table, decimal.Decimal(2001), decimal.Decimal("1")),
+            scenario.without_bracket(table, 2),
+        ]
+        incomes = np.arange(-10, 3000)
+
+        result = scenario.calculate_tax_many(tables, incomes)
+
+        self.assertEqual(result.shape, (5, 3010))
+        for row, t in zip(result, tables):
+            np.testing.assert_allclose(row, t.calculate_tax_many(incomes))
+
+    def test_inflation_adjusted(self) -> None:
+        tables = tax.MultiYearTaxTable(
+            year_tables=[self._load_table()]
+        ).adjusted_for_inflation(self._load_inflation())
+        incomes = np.arange(0, 1000)
+
+        result = scenario.calculate_tax_many(tables.year_tables, incomes)
+
+        np.testing.assert_allclose(
+            result[0], tables.year_tables[0].calculate_tax_many(incomes)
+        )
+
+    def test_chunked(self) -> None:
+        table = self._load_table()
+        tables = [
+            scenario.with_rate(table, 1, decimal.Decimal(i) / 10) for i in range(5)
+        ]
+        incomes = np.arange(0, 1000)
+
+        with unittest.mock.patch.object(scenario, "_CHUNK_ELEMENTS", 64):
+            result = scenario.calculate_tax_many(tables, incomes)
+
+        np.testing.assert_allclose(result, scenario.calculate_tax_many(tables, incomes))
+
+    def test_no_tables(self) -> None:
+        result = scenario.calculate_tax_many([], np.arange(0, 10))
+
+        self.assertEqual(result.shape, (0, 10))
+
+    def test_non_integer_incomes(self) -> None:
+        with self.assertRaises(AssertionError):
+            scenario.calculate_tax_many([self._load_table()], np.array([1.5]))
+
+    def _load_table(self) -> tax.TaxTable:
+        table = """
+        {
+          "year": "2022-23",
+          "brackets": [
+            {
+              "min": "0",
+              "max": "100",
+              "rate": "0"
+            },
+            {
+              "min": "101",
+              "max": "300",
+              "rate": "0.30"
+            },
+            {
+              "min": "301",
+              "max": null,
+              "rate": "0.45"
+            }
+          ]
+        }
+        """
+        return tax._load_tax_table(json.loads(table))
+
+    def _load_inflation(self) -> inflation.Inflation:
+        data = """
+        [
+          {
+            "year": "2022-23",
+            "cpi": "0.0333"
+          }
+        ]
+        """
+        return inflation._load_inflation_from_content(
+            json.loads(data), inflation.InflationMeasure.CPI
+        )
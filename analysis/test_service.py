@@ -0,0 +1,243 @@
+import asyncio
+import decimal
+import json
+import numpy as np
+import typing
+import unittest
+import unittest.mock
+from analysis import inflation, service, tax
+
+
+class ServiceTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_tax(self) -> None:
+        status, body = await self._service().handle(
+            "GET", "/tax?year=2023&income=200&income=250"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {"year": 2023, "tax": [30.0, 45.0]})
+
+    async def test_tax_with_inflation(self) -> None:
+        svc = self._service()
+
+        status, body = await svc.handle("GET", "/tax?year=2022&income=250&measure=cpi")
+
+        table = svc.tables_for(inflation.InflationMeasure.CPI).table_for(2022)
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            body["tax"], [float(table.calculate_tax(decimal.Decimal(250)))]
+        )
+
+    async def test_batches_concurrent_requests(self) -> None:
+        svc = self._service()
+
+        results = await asyncio.gather(
+            *[
+                svc.calculate_tax(2023, np.array([i, i + 1], dtype=np.int64))
+                for i in range(0, 500, 50)
+            ],
+            svc.calculate_tax(2022, np.array([100], dtype=np.int64)),
+        )
+
+        self.assertEqual(svc.batches, 2)
+        self.assertEqual(svc.batched_requests, 11)
+        table = svc.tax_tables.table_for(2023)
+        for i, result in zip(range(0, 500, 50), results):
+            self.assertEqual(
+                result.tolist(), table.calculate_tax_many(np.array([i, i + 1])).tolist()
+            )
+        self.assertEqual(results[-1].tolist(), [50.5])
+
+    async def test_bad_request_doesnt_fail_batch(self) -> None:
+        svc = self._service()
+
+        results = await asyncio.gather(
+            svc.handle("GET", "/tax?year=2023&income=200"),
+            svc.handle("GET", "/tax?year=2019&income=200"),
+            svc.handle("GET", "/tax?year=2023&income=abc"),
+        )
+
+        self.assertEqual([r[0] for r in results], [200, 400, 400])
+        self.assertEqual(results[0][1]["tax"], [30.0])
+
+    async def test_income_out_of_range(self) -> None:
+        svc = self._service()
+
+        results = await asyncio.gather(
+            svc.handle("GET", "/tax?year=2023&income=100000000000000000"),
+            svc.handle("GET", "/tax?year=2023&income=100000000000000000000"),
+            svc.handle("GET", "/tax?year=2023&income=-100000000000000000000"),
+            svc.handle("GET", "/effective-rates?income=100000000000000000000"),
+        )
+
+        self.assertEqual([r[0] for r in results], [400] * 4)
+        self.assertEqual(svc.stats()["endpoints"]["/tax"]["count"], 3)
+
+    async def test_adjust(self) -> None:
+        status, body = await self._service().handle(
+            "GET", "/inflation/adjust?amount=100&from=2021&to=2023&measure=CPI"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {"amount": "108.1500"})
+
+    async def test_adjust_out_of_range(self) -> None:
+        status, _ = await self._service().handle(
+            "GET", "/inflation/adjust?amount=100&from=2023&to=2021"
+        )
+
+        self.assertEqual(status, 400)
+
+    async def test_adjust_huge_amount(self) -> None:
+        svc = self._service()
+
+        status, body = await svc.handle(
+            "GET", "/inflation/adjust?amount=9.99e999999&from=2021&to=2023"
+        )
+
+        self.assertEqual(status, 400)
+        self.assertEqual(body, {"error": "Overflow"})
+        self.assertEqual(svc.stats()["endpoints"]["/inflation/adjust"]["count"], 1)
+
+    async def test_effective_rates(self) -> None:
+        status, body = await self._service().handle(
+            "GET", "/effective-rates?income=200"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            body,
+            [
+                {"year": 2022, "fy": "2022-23", "tax": 100.5, "rate": 0.5025},
+                {"year": 2023, "fy": "2023-24", "tax": 30.0, "rate": 0.15},
+            ],
+        )
+
+    async def test_unknown_measure(self) -> None:
+        status, _ = await self._service().handle(
+            "GET", "/tax?year=2023&income=1&measure=ppi"
+        )
+
+        self.assertEqual(status, 400)
+
+    async def test_unknown_path(self) -> None:
+        status, _ = await self._service().handle("GET", "/nope")
+
+        self.assertEqual(status, 404)
+
+    async def test_stats(self) -> None:
+        svc = self._service()
+        for _ in range(3):
+            await svc.handle("GET", "/tax?year=2023&income=100")
+
+        status, body = await svc.handle("GET", "/stats")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body["endpoints"]["/tax"]["count"], 3)
+        self.assertGreater(body["endpoints"]["/tax"]["p99_ms"], 0)
+        self.assertGreaterEqual(
+            body["endpoints"]["/tax"]["p99_ms"], body["endpoints"]["/tax"]["p50_ms"]
+        )
+        self.assertEqual(body["batches"], 3)
+
+    async def test_tables_adjusted_once(self) -> None:
+        svc = self._service()
+
+        result = svc.tables_for(inflation.InflationMeasure.CPI)
+
+        self.assertIs(svc.tables_for(inflation.InflationMeasure.CPI), result)
+        self.assertIs(svc.tables_for(None), svc.tax_tables)
+
+    def test_percentile(self) -> None:
+        values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+        self.assertEqual(service._percentile(values, 0.5), 3.0)
+        self.assertEqual(service._percentile(values, 0.99), 5.0)
+        self.assertEqual(service._percentile(values, 0.0), 1.0)
+        self.assertEqual(service._percentile([], 0.5), 0.0)
+
+    async def test_http(self) -> None:
+        server = await self._service().serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for target, connection in [
+                ("/tax?year=2023&income=200", "keep-alive"),
+                ("/stats", "close"),
+            ]:
+                writer.write(
+                    f"GET {target} HTTP/1.1\r\nHost: x\r\nConnection: {connection}"
+                    "\r\n\r\n".encode()
+                )
+                responses.append(await self._read_response(reader))
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        self.assertEqual(responses[0], (200, {"year": 2023, "tax": [30.0]}))
+        self.assertEqual(responses[1][0], 200)
+        self.assertEqual(responses[1][1]["endpoints"]["/tax"]["count"], 1)
+
+    async def test_http_internal_error(self) -> None:
+        svc = self._service()
+
+        async def fail(method: str, target: str) -> tuple[int, typing.Any]:
+            raise RuntimeError("bug")
+
+        server = await svc.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            with unittest.mock.patch.object(svc, "handle", fail):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n")
+                response = await self._read_response(reader)
+                writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        self.assertEqual(response, (500, {"error": "Internal error"}))
+
+    async def _read_response(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[int, typing.Any]:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        status = int(head.split(" ")[1])
+        length = next(
+            int(h.split(":")[1])
+            for h in head.split("\r\n")
+            if h.lower().startswith("content-length")
+        )
+        return status, json.loads(await reader.readexactly(length))
+
+    def _service(self) -> service.Service:
+        tables = """
+        [
+          {
+            "year": "2023-24",
+            "brackets": [
+              {"min": "0", "max": "100", "rate": "0"},
+              {"min": "101", "max": "300", "rate": "0.3"},
+              {"min": "301", "max": null, "rate": "0.45"}
+            ]
+          },
+          {
+            "year": "2022-23",
+            "brackets": [{"min": "0", "max": null, "rate": "0.5"}]
+          }
+        ]
+        """
+        data = """
+        [
+          {"year": "2023-24", "cpi": "0.02", "wpi": "0.04"},
+          {"year": "2022-23", "cpi": "0.03", "wpi": "0.03"},
+          {"year": "2021-22", "cpi": "0.05", "wpi": "0.02"}
+        ]
+        """
+        return service.Service(
+            tax_tables=tax._load_tax_tables_from_content(json.loads(tables)),
+            inflations=inflation._load_all_measures(json.loads(data)),
+        )
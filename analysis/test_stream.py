@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import tracemalloc
+import typing
+import unittest
+from analysis import stream
+
+
+class IterArrayTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._fname = os.path.join(self._dir.name, "data.json")
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def test_elements(self) -> None:
+        self._write('[{"a": 1}, [2, 3], "four", 5, null]')
+
+        result = [e.value for e in stream.iter_array(self._fname)]
+
+        self.assertEqual(result, [{"a": 1}, [2, 3], "four", 5, None])
+
+    def test_elements_across_chunks(self) -> None:
+        data: list[typing.Any] = [
+            {"year": str(i), "values": list(range(i))} for i in range(20)
+        ]
+        data.append(12345678)
+        self._write(json.dumps(data, indent=2))
+
+        for chunk_size in [1, 2, 7, 64]:
+            with self.subTest(chunk_size=chunk_size):
+                result = [e.value for e in stream.iter_array(self._fname, chunk_size)]
+
+                self.assertEqual(result, data)
+
+    def test_byte_offsets(self) -> None:
+        self._write(' [ "é",\n{"b": "ü"} ] ')
+
+        result = list(stream.iter_array(self._fname, chunk_size=3))
+
+        with open(self._fname, "rb") as fh:
+            raw = fh.read()
+        self.assertEqual([(e.start, e.end) for e in result], [(3, 7), (9, 20)])
+        self.assertEqual(
+            [json.loads(raw[e.start : e.end]) for e in result], ["é", {"b": "ü"}]
+        )
+
+    def test_empty(self) -> None:
+        self._write(" [ ] \n")
+
+        self.assertEqual(list(stream.iter_array(self._fname)), [])
+
+    def test_not_an_array(self) -> None:
+        self._write('{"a": 1}')
+
+        with self.assertRaises(AssertionError):
+            list(stream.iter_array(self._fname))
+
+    def test_missing_delimiter(self) -> None:
+        self._write("[1 2]")
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(stream.iter_array(self._fname))
+
+    def test_trailing_comma(self) -> None:
+        self._write("[1, 2,]")
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(stream.iter_array(self._fname))
+
+    def test_truncated(self) -> None:
+        self._write('[1, {"a": ')
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(stream.iter_array(self._fname, chunk_size=4))
+
+    def test_extra_data(self) -> None:
+        self._write("[1] 2")
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(stream.iter_array(self._fname))
+
+    def test_errors_after_earlier_elements(self) -> None:
+        self._write("[1, 2, }")
+        elements = stream.iter_array(self._fname)
+
+        self.assertEqual([next(elements).value, next(elements).value], [1, 2])
+        with self.assertRaises(json.JSONDecodeError):
+            next(elements)
+
+    def test_flat_memory(self) -> None:
+        element = {"brackets": [{"min": str(i), "rate": "0.1"} for i in range(50)]}
+        with open(self._fname, "w") as fh:
+            fh.write("[")
+            fh.write(",".join(json.dumps(element) for _ in range(2000)))
+            fh.write("]")
+
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in stream.iter_array(self._fname))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(count, 2000)
+        self.assertLess(peak, os.path.getsize(self._fname) / 10)
+
+    def _write(self, content: str) -> None:
+        with open(self._fname, "w", encoding="utf-8") as fh:
+            fh.write(content)
@@ -1,7 +1,14 @@
 import decimal
 import json
+import numpy as np
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
 import unittest
-from analysis import tax
+import unittest.mock
+from analysis import fixed_point, inflation, registry, tax
 
 
 class LoadTaxBracketTests(unittest.TestCase):
@@ -450,6 +457,34 @@ class TaxBracketTests(unittest.TestCase):
 
         self.assertEqual(result, decimal.Decimal(0))
 
+    def test_slots(self) -> None:
+        self.assertFalse(hasattr(self._load_bracket(), "__dict__"))
+
+    def test_equality(self) -> None:
+        bracket = tax.TaxBracket(
+            start=decimal.Decimal(101),
+            end=decimal.Decimal(300),
+            rate=decimal.Decimal("0.4"),
+        )
+
+        self.assertEqual(self._load_bracket(), bracket)
+        self.assertEqual(hash(self._load_bracket()), hash(bracket))
+        self.assertNotEqual(
+            self._load_bracket(),
+            tax.TaxBracket(start=bracket.start, end=None, rate=bracket.rate),
+        )
+
+    def test_pickle(self) -> None:
+        bracket = self._load_bracket()
+
+        self.assertEqual(pickle.loads(pickle.dumps(bracket)), bracket)
+
+    def test_shares_decimals(self) -> None:
+        result = [self._load_bracket(), self._load_bracket()]
+
+        self.assertIs(result[0].rate, result[1].rate)
+        self.assertIs(result[0].start, result[1].start)
+
     def _expect_result(self, taxable_amount: int, expected_result: int | str) -> None:
         result = self._load_bracket().compute_tax(decimal.Decimal(taxable_amount))
 
@@ -477,12 +512,21 @@ class TaxTableTests(unittest.TestCase):
     def test_middle_bracket(self) -> None:
         self._expect_result(150, 15)
 
+    def test_middle_bracket_start(self) -> None:
+        self._expect_result(101, "0.3")
+
     def test_middle_bracket_end(self) -> None:
         self._expect_result(300, 60)
 
     def test_final_bracket(self) -> None:
         self._expect_result(500, 150)
 
+    def test_final_bracket_start(self) -> None:
+        self._expect_result(301, "60.45")
+
+    def test_negative_income(self) -> None:
+        self._expect_result(-50, 0)
+
     def _expect_result(self, taxable_amount: int, expected_result: int | str) -> None:
         result = self._load_table().calculate_tax(decimal.Decimal(taxable_amount))
 
@@ -512,3 +556,471 @@ class TaxTableTests(unittest.TestCase):
         }
         """
         return tax._load_tax_table(json.loads(bracket))
+
+
+class TaxTableManyTests(unittest.TestCase):
+
+    def test_matches_scalar(self) -> None:
+        table = self._load_table()
+        incomes = np.arange(0, 1000, dtype=np.int64)
+
+        result = table.calculate_tax_many(incomes)
+
+        self.assertEqual(
+            result.tolist(),
+            [float(table.calculate_tax(decimal.Decimal(int(i)))) for i in incomes],
+        )
+
+    def test_preserves_shape(self) -> None:
+        incomes = np.array([[0, 150], [300, 500]], dtype=np.int32)
+
+        result = self._load_table().calculate_tax_many(incomes)
+
+        self.assertEqual(result.tolist(), [[0, 15], [60, 125]])
+
+    def test_overflowing_incomes(self) -> None:
+        table = self._load_table()
+        # Past where tax units leave the integers float64 holds exactly, and int64
+        _, hi = table.fixed_point_table.income_range(
+            per_dollar=1, max_units=fixed_point.FLOAT_EXACT_UNITS
+        )
+        limits = np.iinfo(np.int64)
+        incomes = np.array(
+            [hi - 1, hi, hi + 1, 10**15 + 7, 10**17, limits.min, limits.max],
+            dtype=np.int64,
+        )
+
+        result = table.calculate_tax_many(incomes)
+
+        self.assertEqual(
+            result.tolist(),
+            [float(table.calculate_tax(decimal.Decimal(int(i)))) for i in incomes],
+        )
+
+    def test_fractional_brackets(self) -> None:
+        table = tax.TaxTable(
+            year=2024,
+            brackets=[
+                tax.TaxBracket(
+                    start=decimal.Decimal(0),
+                    end=decimal.Decimal("100.5"),
+                    rate=decimal.Decimal(0),
+                ),
+                tax.TaxBracket(
+                    start=decimal.Decimal("100.5"),
+                    end=None,
+                    rate=decimal.Decimal("0.3"),
+                ),
+            ],
+        )
+        incomes = np.array([100, 101, 102, 500], dtype=np.int64)
+
+        result = table.calculate_tax_many(incomes)
+
+        for income, tax_amount in zip(incomes, result):
+            self.assertAlmostEqual(
+                tax_amount, float(table.calculate_tax(decimal.Decimal(int(income))))
+            )
+
+    def test_marginal_rate(self) -> None:
+        incomes = np.array([-1, 0, 100, 101, 300, 301, 501, 10_000])
+
+        result = self._load_table().marginal_rate_many(incomes)
+
+        self.assertEqual(result.tolist(), [0, 0, 0, 0.3, 0.3, 0.325, 0.45, 0.45])
+
+    def test_float_incomes(self) -> None:
+        with self.assertRaises(AssertionError):
+            self._load_table().calculate_tax_many(np.array([1.5]))
+
+    def _load_table(self) -> tax.TaxTable:
+        table = """
+        {
+          "year": "2023-24",
+          "brackets": [
+            {
+              "min": "0",
+              "max": "100",
+              "rate": "0"
+            },
+            {
+              "min": "101",
+              "max": "300",
+              "rate": "0.30"
+            },
+            {
+              "min": "301",
+              "max": "500",
+              "rate": "0.325"
+            },
+            {
+              "min": "501",
+              "max": null,
+              "rate": "0.45"
+            }
+          ]
+        }
+        """
+        return tax._load_tax_table(json.loads(table))
+
+
+class MultiYearTaxTableTests(unittest.TestCase):
+
+    def test_table_for(self) -> None:
+        result = self._load_tables().table_for(2022)
+
+        self.assertEqual(result.year, 2022)
+        self.assertEqual(
+            result.calculate_tax(decimal.Decimal(200)), decimal.Decimal("100.5")
+        )
+
+    def test_table_for_missing_year(self) -> None:
+        with self.assertRaises(AssertionError):
+            self._load_tables().table_for(2020)
+
+    def test_latest_year(self) -> None:
+        self.assertEqual(self._load_tables().latest_year, 2023)
+
+    def test_earliest_year(self) -> None:
+        self.assertEqual(self._load_tables().earliest_year, 2021)
+
+    def test_between(self) -> None:
+        result = self._load_tables().between(2022, 2030)
+
+        self.assertEqual([t.year for t in result.year_tables], [2023, 2022])
+
+    def test_between_no_years(self) -> None:
+        result = self._load_tables().between(2010, 2020)
+
+        self.assertEqual(result.year_tables, [])
+
+    def test_adjusted_for_inflation_reuses_views(self) -> None:
+        tables = self._load_tables()
+        inflate = inflation._load_inflation_from_content(
+            json.loads(
+                """
+                [
+                  {"year": "2022-23", "cpi": "0.1"},
+                  {"year": "2021-22", "cpi": "0.1"}
+                ]
+                """
+            ),
+            inflation.InflationMeasure.CPI,
+        )
+        first = tables.adjusted_for_inflation(inflate)
+        hits = tax.adjusted_views.hits
+
+        second = tables.adjusted_for_inflation(inflate)
+
+        self.assertEqual(tax.adjusted_views.hits, hits + 3)
+        for a, b in zip(first.year_tables, second.year_tables):
+            self.assertIs(a, b)
+
+    def test_invalidate_clears_views(self) -> None:
+        tables = self._load_tables()
+        inflate = inflation._load_inflation_from_content(
+            json.loads('[{"year": "2022-23", "cpi": "0.1"}]'),
+            inflation.InflationMeasure.CPI,
+        )
+        tables.table_for(2022).adjusted_for_inflation(inflate, to_year=2023)
+        self.assertGreater(tax.adjusted_views.info().currsize, 0)
+
+        registry.invalidate("data/aus_tax_table.json")
+
+        self.assertEqual(tax.adjusted_views.info().currsize, 0)
+
+    def test_duplicate_year(self) -> None:
+        table = self._load_tables().table_for(2022)
+
+        with self.assertRaises(AssertionError):
+            tax.MultiYearTaxTable(year_tables=[table, table])
+
+    def _load_tables(self) -> tax.MultiYearTaxTable:
+        tables = """
+        [
+          {
+            "year": "2023-24",
+            "brackets": [{"min": "0", "max": null, "rate": "0.3"}]
+          },
+          {
+            "year": "2022-23",
+            "brackets": [{"min": "0", "max": null, "rate": "0.5"}]
+          },
+          {
+            "year": "2021-22",
+            "brackets": [{"min": "0", "max": null, "rate": "0.7"}]
+          }
+        ]
+        """
+        return tax._load_tax_tables_from_content(json.loads(tables))
+
+
+class IterTaxTablesTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._fname = os.path.join(self._dir.name, "tax_table.json")
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def test_iter_tax_tables(self) -> None:
+        self._write(
+            """
+            [
+              {
+                "year": "2023-24",
+                "brackets": [
+                  {"min": "0", "max": "100", "rate": "0"},
+                  {"min": "101", "max": null, "rate": "0.3"}
+                ]
+              },
+              {
+                "year": "2022-23",
+                "brackets": [{"min": "0", "max": null, "rate": "0.5"}]
+              }
+            ]
+            """
+        )
+
+        result = list(tax.iter_tax_tables(self._fname))
+
+        self.assertEqual([t.year for t in result], [2023, 2022])
+        self.assertEqual(
+            result[0].calculate_tax(decimal.Decimal(200)), decimal.Decimal("30")
+        )
+
+    def test_matches_load_tax_tables(self) -> None:
+        fname = "data/aus_tax_table.json"
+
+        result = list(tax.iter_tax_tables(fname))
+
+        with open(fname, "r") as fh:
+            expected = tax._load_tax_tables_from_content(json.load(fh))
+        self.assertEqual(result, expected.year_tables)
+        self.assertEqual(
+            tax.load_tax_tables(fname, use_cache=False).year_tables,
+            expected.year_tables,
+        )
+
+    def test_validates_each_table_as_it_is_read(self) -> None:
+        self._write(
+            """
+            [
+              {
+                "year": "2023-24",
+                "brackets": [{"min": "0", "max": null, "rate": "0.3"}]
+              },
+              {
+                "year": "2022-23",
+                "brackets": [
+                  {"min": "0", "max": "100", "rate": "0"},
+                  {"min": "102", "max": null, "rate": "0.3"}
+                ]
+              }
+            ]
+            """
+        )
+        tables = tax.iter_tax_tables(self._fname)
+
+        self.assertEqual(next(tables).year, 2023)
+        with self.assertRaises(AssertionError):
+            next(tables)
+
+    def test_duplicate_year(self) -> None:
+        self._write(
+            """
+            [
+              {
+                "year": "2023-24",
+                "brackets": [{"min": "0", "max": null, "rate": "0.3"}]
+              },
+              {
+                "year": "2023-24",
+                "brackets": [{"min": "0", "max": null, "rate": "0.5"}]
+              }
+            ]
+            """
+        )
+
+        with self.assertRaises(AssertionError):
+            list(tax.iter_tax_tables(self._fname))
+
+    def _write(self, content: str) -> None:
+        with open(self._fname, "w") as fh:
+            fh.write(content)
+
+
+class LazyMultiYearTaxTableTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._fname = os.path.join(self._dir.name, "tax_table.json")
+        with open(self._fname, "w") as fh:
+            fh.write(
+                """
+                [
+                  {
+                    "year": "2023-24",
+                    "brackets": [{"min": "0", "max": null, "rate": "0.3"}]
+                  },
+                  {
+                    "year": "2021-22",
+                    "brackets": [{"min": "0", "max": null, "rate": "0.7"}]
+                  },
+                  {
+                    "year": "2022-23",
+                    "brackets": [{"min": "0", "max": null, "rate": "0.5"}]
+                  }
+                ]
+                """
+            )
+
+    def tearDown(self) -> None:
+        registry.invalidate()
+        self._dir.cleanup()
+
+    def test_reads_nothing_up_front(self) -> None:
+        tables = self._load()
+
+        self.assertEqual(tables.years, [2023, 2021, 2022])
+        self.assertEqual(tables.latest_year, 2023)
+        self.assertEqual(tables.earliest_year, 2021)
+        self.assertEqual(tables._tables, {})
+
+    def test_table_for(self) -> None:
+        tables = self._load()
+
+        result = tables.table_for(2022)
+
+        self.assertEqual(
+            result.calculate_tax(decimal.Decimal(100)), decimal.Decimal("50.5")
+        )
+        self.assertEqual(list(tables._tables), [2022])
+        self.assertIs(tables.table_for(2022), result)
+
+    def test_table_for_missing_year(self) -> None:
+        with self.assertRaises(AssertionError):
+            self._load().table_for(2020)
+
+    def test_between(self) -> None:
+        tables = self._load()
+
+        result = tables.between(2022, 2023)
+
+        self.assertEqual([t.year for t in result.year_tables], [2023, 2022])
+        self.assertEqual(sorted(tables._tables), [2022, 2023])
+
+    def test_matches_eager(self) -> None:
+        for use_cache in [False, True]:
+            with self.subTest(use_cache=use_cache):
+                result = self._load(use_cache=use_cache)
+
+                self.assertEqual(
+                    result.year_tables,
+                    tax.load_tax_tables(self._fname, use_cache=False).year_tables,
+                )
+
+    def test_matches_eager_data(self) -> None:
+        fname = "data/aus_tax_table.json"
+
+        result = tax.load_tax_tables(fname, use_cache=False, lazy=True)
+
+        self.assertEqual(
+            result.to_multi_year(), tax.load_tax_tables(fname, use_cache=False)
+        )
+
+    def test_validates_on_first_access(self) -> None:
+        with open(self._fname, "w") as fh:
+            fh.write(
+                """
+                [
+                  {
+                    "year": "2023-24",
+                    "brackets": [{"min": "0", "max": null, "rate": "0.3"}]
+                  },
+                  {
+                    "year": "2022-23",
+                    "brackets": [{"min": "0", "max": null, "rate": "1.5"}]
+                  }
+                ]
+                """
+            )
+        tables = self._load()
+
+        self.assertEqual(tables.table_for(2023).year, 2023)
+        with self.assertRaises(AssertionError):
+            tables.table_for(2022)
+
+    def test_source_changed(self) -> None:
+        tables = self._load()
+        with open(self._fname, "a") as fh:
+            fh.write(" ")
+
+        with self.assertRaises(AssertionError):
+            tables.table_for(2023)
+
+    def test_source_changed_since_cached(self) -> None:
+        self._load(use_cache=True)
+        with open(self._fname, "w") as fh:
+            fh.write(
+                """
+                [
+                  {
+                    "year": "2024-25",
+                    "brackets": [{"min": "0", "max": null, "rate": "0.4"}]
+                  },
+                  {
+                    "year": "2023-24",
+                    "brackets": [{"min": "0", "max": null, "rate": "0.35"}]
+                  }
+                ]
+                """
+            )
+
+        tables = self._load(use_cache=True)
+
+        self.assertEqual(tables.years, [2024, 2023])
+        self.assertEqual(
+            tables.table_for(2023).brackets[0].rate, decimal.Decimal("0.35")
+        )
+
+    def test_source_touched_since_cached(self) -> None:
+        self._load(use_cache=True)
+        stat = os.stat(self._fname)
+        os.utime(self._fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        with unittest.mock.patch.object(
+            tax, "_index_tax_tables", wraps=tax._index_tax_tables
+        ) as index:
+            # The first in this process, then each as if in a fresh one
+            results = [self._load(use_cache=True)]
+            for _ in range(3):
+                registry.invalidate()
+                results.append(self._load(use_cache=True))
+
+        self.assertEqual(index.call_count, 0)
+        for result in results:
+            self.assertEqual(result.table_for(2022).year, 2022)
+
+    def _load(self, use_cache: bool = False) -> tax.LazyMultiYearTaxTable:
+        return tax.load_tax_tables(self._fname, use_cache=use_cache, lazy=True)
+
+
+class ImportTests(unittest.TestCase):
+
+    def test_no_heavy_dependencies(self) -> None:
+        # In a fresh interpreter, as this one has them all loaded already
+        script = """
+import sys
+import analysis.tax, analysis.inflation, analysis.parse, analysis.labels, analysis.instrument
+print(sorted({m.split(".")[0] for m in sys.modules} & {"numpy", "pandas", "matplotlib"}))
+"""
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        self.assertEqual(result.stdout.strip(), "[]")